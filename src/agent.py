@@ -8,6 +8,7 @@ from neuro.container import Container
 from neuro.dopamine_portion import DopaminePortion
 from neuro.hyper_params import HyperParameters
 from neuro.network import Network
+from neuro.tick_ring_buffer import TickRingBuffer
 from neuro.zones.confluence_zone import ConfluenceZone
 from neuro.zones.motor_zone import MotorZone
 from neuro.zones.reflex_zone import ReflexZone
@@ -35,15 +36,17 @@ class Agent:
     AGI agent is trying to adapt to the environment by observing it's state
     and learning useful reflexes to maximize dopamine
     """
-    def __init__(self):
-        random.seed(0)
+    def __init__(self, seed: int = 0, log_filename: str = log_path):
+        random.seed(seed)
+        self.seed = seed
         self.container = Container()
         self._build_network()
         self.network = Network(container=self.container, agent=self)
-        self.logger = Logger(self, log_path)
+        self.network.compile_schedule()
+        self.logger = Logger(self, log_filename)
         self.focused_body_idx = None
         self.surprise = 0
-        self.dopamine_flow = {}
+        self.dopamine_flow = TickRingBuffer(HyperParameters.history_retention)
         self.actions = {a: 0 for a in ACTIONS}
         self.attended_location_pattern = None
         self.attention_strategy = 'loop'
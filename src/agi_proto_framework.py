@@ -32,6 +32,7 @@ from Box2D.examples.settings import fwSettings
 from pygame.locals import (QUIT, KEYDOWN)
 from cv.image_processor import ImageProcessor
 from agent import Agent
+from agi_proto_world import AgiProtoWorld, our_zoom
 from utils import path_from_root
 
 from agent_hand import AgentHand
@@ -41,10 +42,6 @@ from main import SERVER, DISTANCE
 HZ = 34
 
 
-agent = Agent()
-
-
-
 try:
     from backends.pygame_gui import (fwGUI, gui)
     GUIEnabled = True
@@ -63,12 +60,6 @@ def center_of_mass(vertices):
     return x / len(vertices), y / len(vertices)
 
 
-def our_zoom(vertices):
-    x = vertices[0]
-    y = vertices[1]
-    return x * 10 + 320, (20 - y) * 10 + 240
-
-
 class CustomDraw(Box2D.examples.backends.pygame_framework.PygameDraw):
 
     EPS = 1
@@ -213,8 +204,8 @@ class CustomPygameFramework(Box2D.examples.framework.FrameworkBase if SERVER
         #         self.world.bodies[self.min_ind].linearVelocity[1] = self.arm_step['up']
         #         self.min_ind = None
 
-        if bt[pygame.K_a] or agent.actions['move_left']:
-            k = 1 if agent.actions['move_left'] == 2 else 0.5
+        if bt[pygame.K_a] or self.agent.actions['move_left']:
+            k = 1 if self.agent.actions['move_left'] == 2 else 0.5
             right -= 10 * k
             if not (self.min_ind and len([p[0] for p in approx_contour if p[0] < 3]) != 0):
                 self.hand_rect.centerx -= 5 * k
@@ -226,8 +217,8 @@ class CustomPygameFramework(Box2D.examples.framework.FrameworkBase if SERVER
                     self.hand_push = self.hand_push_l
                     self.push_near_object(val=25)
 
-        if bt[pygame.K_d] or agent.actions['move_right']:
-            k = 1 if agent.actions['move_right'] == 2 else 0.5
+        if bt[pygame.K_d] or self.agent.actions['move_right']:
+            k = 1 if self.agent.actions['move_right'] == 2 else 0.5
             right += 10 * k
             if not (self.min_ind and len([p[0] for p in approx_contour if p[0] > 636]) != 0):
                 self.hand_rect.centerx += 5 * k
@@ -239,8 +230,8 @@ class CustomPygameFramework(Box2D.examples.framework.FrameworkBase if SERVER
                     self.hand_push = self.hand_push_r
                     self.push_near_object(val=25)
 
-        if bt[pygame.K_w] or agent.actions['move_up']:
-            k = 1 if agent.actions['move_up'] == 2 else 0.5
+        if bt[pygame.K_w] or self.agent.actions['move_up']:
+            k = 1 if self.agent.actions['move_up'] == 2 else 0.5
             up += 10 * k
             if not (self.min_ind and len([p[1] for p in approx_contour if p[1] < 255]) != 0):
                 self.hand_rect.centery -= 5 * k
@@ -249,8 +240,8 @@ class CustomPygameFramework(Box2D.examples.framework.FrameworkBase if SERVER
                 if self.min_ind:
                     self.world.bodies[self.min_ind].worldCenter[1] += 0.5 * k
 
-        if bt[pygame.K_s] or agent.actions['move_down']:
-            k = 1 if agent.actions['move_down'] == 2 else 0.5
+        if bt[pygame.K_s] or self.agent.actions['move_down']:
+            k = 1 if self.agent.actions['move_down'] == 2 else 0.5
             up -= 10 * k
             if not (self.min_ind and len([p[1] for p in approx_contour if p[1] > 435]) != 0):
                 self.hand_rect.centery += 5 * k
@@ -270,20 +261,20 @@ class CustomPygameFramework(Box2D.examples.framework.FrameworkBase if SERVER
             if self.min_ind:
                 self.world.bodies[self.min_ind].angle += 0.5
 
-        if self.grab and self.min_ind and agent.actions['grab'] == 0:
+        if self.grab and self.min_ind and self.agent.actions['grab'] == 0:
             body = self.world.bodies[self.min_ind]
             self.set_body_dynamics(body, 1.0, self.arm_step['right'], self.arm_step['up'])
             self.min_ind = None
             self.grab = False
 
-        if self.grab and self.min_ind and agent.actions['grab'] == 1:
+        if self.grab and self.min_ind and self.agent.actions['grab'] == 1:
             body = self.world.bodies[self.min_ind]
             self.set_body_dynamics(body)
 
-        elif self.grab and not self.min_ind and agent.actions['grab'] == 0:
+        elif self.grab and not self.min_ind and self.agent.actions['grab'] == 0:
             self.grab = False
 
-        elif not self.grab and agent.actions['grab'] == 1:
+        elif not self.grab and self.agent.actions['grab'] == 1:
             self.grab = True
             list_ind = []
             for ind in range(len(self.world.bodies)):
@@ -311,7 +302,7 @@ class CustomPygameFramework(Box2D.examples.framework.FrameworkBase if SERVER
         sc_text_2 = self.f_sys.render(
             'Current tick: %s' % self.agent_message['current_tick'], 1, color, (0, 0, 0)
         )
-        text_3 = self.f_sys.render(f'energy: {agent.striatum_energy:3.1f}', 1, color, (0, 0, 0))
+        text_3 = self.f_sys.render(f'energy: {self.agent.striatum_energy:3.1f}', 1, color, (0, 0, 0))
 
         text_pos = sc_text.get_rect(topleft=(13, 13))
         text_pos_2 = sc_text.get_rect(topleft=(13, 33))
@@ -377,12 +368,9 @@ class CustomPygameFramework(Box2D.examples.framework.FrameworkBase if SERVER
         self.world.renderer = None
 
 
-class AgiProtoFramework(Box2D.examples.framework.FrameworkBase if SERVER else CustomPygameFramework):
+class AgiProtoFramework(AgiProtoWorld, Box2D.examples.framework.FrameworkBase if SERVER else CustomPygameFramework):
     arm_step = {'right': 0, 'up': 0}
     # settings = sfwSettings
-    if SERVER:
-        agent_hand = AgentHand()
-        agent_hand += (9.1, 6)
     num_step = 0
     last_step = None
     last_data = None
@@ -391,12 +379,9 @@ class AgiProtoFramework(Box2D.examples.framework.FrameworkBase if SERVER else Cu
 
     name = "AGI proto"
     description = "Keys: left = a, right = d, down = s, up = w, grab = q, throw = e"
-    x_offset = -10
-    y_offset = 10
     grab = False
     min_ind = False
     push = False
-    ground_vertices = [(-32, 38), (-32, 0), (32, 0), (32, 38)]
     our_color = [
         (255, 0, 0),
         (0, 255, 0),
@@ -410,190 +395,18 @@ class AgiProtoFramework(Box2D.examples.framework.FrameworkBase if SERVER else Cu
         (0, 250, 100)
     ]
 
-    def __init__(self):
+    def __init__(self, agent: Agent = None):
+        # set before the base classes are initialized, the pygame framework reads actions in its loop
+        self.agent = agent if agent is not None else Agent()
         super(AgiProtoFramework, self).__init__()
         self.using_contacts = True
-
-        # Ground body
-        world = self.world
-        ground = world.CreateBody(
-            shapes=b2LoopShape(vertices=self.ground_vertices, )
-        )
+        if SERVER:
+            self.arm_step = {'right': 0, 'up': 0}
+            self.agent_hand = AgentHand()
+            self.agent_hand += (9.1, 6)
 
         self.current_tick = 0
-        self.init_circle(world)
-        self.init_triangle(world)
-        self.init_teacher(world)
-        # self.init_teacher2(world)
-
-    def init_circle(self, world):
-        fixture = b2FixtureDef(
-            shape=b2CircleShape(radius=2),
-            density=1,
-            restitution=0.5
-        )
-
-        circle = world.CreateBody(
-            type=b2_dynamicBody,
-            position=(10, 2),
-            fixtures=fixture,
-            awake=True,
-            userData='circle'
-        )
-
-    def init_triangle(self, world):
-        vertices = [(0, 0), (-4, 0), (-2, 2), ]
-        vertices = [(2 * x, 2 * y) for x, y in vertices]
-        triangle = b2FixtureDef(
-            shape=b2PolygonShape(vertices=vertices),
-            density=10,
-            restitution=0.2
-        )
-
-        triangle_left = world.CreateBody(
-            type=b2_dynamicBody,
-            position=(self.x_offset, 0),
-            fixtures=triangle,
-            gravityScale=1.0,
-            awake=True,
-            userData='triangle'
-        )
-        triangle_left.My_color = (1, 1, 1)
-
-    def init_teacher(self, world):
-        triangle = b2FixtureDef(
-            # shape=b2PolygonShape(vertices=vertices),
-            shape=b2PolygonShape(box=(1.5, 1.5)),
-            density=10,
-            restitution=0.2
-        )
-        triangle.name = 'Teacher'
-        teacher = world.CreateBody(
-            type=b2_dynamicBody,
-            position=(self.x_offset + 20, 20),
-            fixtures=triangle,
-            gravityScale=0.0,
-            awake=True,
-            userData='Teacher'
-        )
-        teacher.My_color = (1, 2, 1)
-
-    def Keyboard(self):
-        right = 0
-        up = 0
-        rotation = 0
-
-        if self.min_ind:
-            if type(self.world.bodies[self.min_ind].fixtures[0].shape) == Box2D.b2CircleShape:
-                approx_contour = self.get_approx_for_circle(self.world.bodies[self.min_ind])
-            elif type(self.world.bodies[self.min_ind].fixtures[0].shape) == Box2D.Box2D.b2PolygonShape:
-                approx_contour = self.get_approx_for_poly(self.world.bodies[self.min_ind].fixtures[0].shape.vertices,
-                                                          self.world.bodies[self.min_ind].transform.angle,
-                                                          self.world.bodies[self.min_ind].transform.position)
-            approx_contour = [our_zoom(p) for p in approx_contour]
-
-        if self.grab and self.min_ind and agent.actions['grab'] == 0:
-            self.world.bodies[self.min_ind].gravityScale = 1.0
-            self.world.bodies[self.min_ind].linearVelocity[0] = self.arm_step['right']
-            self.world.bodies[self.min_ind].linearVelocity[1] = self.arm_step['up']
-            self.min_ind = None
-            self.grab = False
-
-        elif self.grab and not self.min_ind and agent.actions['grab'] == 0:
-            self.grab = False
-
-        elif not self.grab and agent.actions['grab'] == 1:
-            self.grab = True
-            list_ind = []
-            for ind in range(len(self.world.bodies)):
-                u = our_zoom(self.world.bodies[ind].worldCenter)
-                dist = (abs(self.agent_hand._center[0] - u[0]) +
-                        abs(self.agent_hand._center[1] - u[1]))
-                if dist < 20:
-                    list_ind.append((ind, dist))
-            if len(list_ind) > 0:
-                self.min_ind = 0
-                for ind in range(len(list_ind)):
-                    if list_ind[self.min_ind][1] > list_ind[ind][1]:
-                        self.min_ind = ind
-                self.min_ind = list_ind[self.min_ind][0]
-                self.world.bodies[self.min_ind].gravityScale = 0.0
-                self.world.bodies[self.min_ind].linearVelocity[0] = 0
-                self.world.bodies[self.min_ind].linearVelocity[1] = 0
-
-        # if agent.actions['grab']:
-        #     if self.grab and self.min_ind:
-        #         self.world.bodies[self.min_ind].gravityScale = 1.0
-        #         self.world.bodies[self.min_ind].linearVelocity[0] = self.arm_step['right']
-        #         self.world.bodies[self.min_ind].linearVelocity[1] = self.arm_step['up']
-        #         self.min_ind = None
-        #         self.grab = False
-        #     elif self.grab and not self.min_ind:
-        #         self.grab = False
-        #     else:
-        #         self.grab = True
-        #         list_ind = []
-        #         for ind in range(len(self.world.bodies)):
-        #             u = our_zoom(self.world.bodies[ind].worldCenter)
-        #             dist = (abs(self.hand_rect.center[0] - u[0]) +
-        #                     abs(self.hand_rect.center[1] - u[1]))
-        #             if dist < 20:
-        #                 list_ind.append((ind, dist))
-        #         if len(list_ind) > 0:
-        #             self.min_ind = 0
-        #             for ind in range(len(list_ind)):
-        #                 if list_ind[self.min_ind][1] > list_ind[ind][1]:
-        #                     self.min_ind = ind
-        #             self.min_ind = list_ind[self.min_ind][0]
-        #             self.world.bodies[self.min_ind].gravityScale = 0.0
-        #             self.world.bodies[self.min_ind].linearVelocity[0] = 0
-        #             self.world.bodies[self.min_ind].linearVelocity[1] = 0
-
-        if agent.actions['move_left']:
-            k = 1 if agent.actions['move_left'] == 2 else 0.5
-            right -= 10 * k
-            if not (self.min_ind and len([p[0] for p in approx_contour if p[0] < 3]) != 0):
-                if not self.agent_hand.left < -31.9:
-                    self.agent_hand -= (0.5 * k, 0)
-                if self.min_ind:
-                    self.world.bodies[self.min_ind].worldCenter[0] -= 0.5 * k
-                elif self.push:
-                    self.hand_push = self.hand_push_l
-                    self.push_near_object(val=25)
-
-        if agent.actions['move_right']:
-            k = 1 if agent.actions['move_right'] == 2 else 0.5
-            right += 10 * k
-            if not (self.min_ind and len([p[0] for p in approx_contour if p[0] > 636]) != 0):
-                if not self.agent_hand.right > 31.9:
-                    self.agent_hand += (0.5 * k, 0)
-                if self.min_ind:
-                    self.world.bodies[self.min_ind].worldCenter[0] += 0.5 * k
-                elif self.push:
-                    self.hand_push = self.hand_push_r
-                    self.push_near_object(val=25)
-
-        if agent.actions['move_up']:
-            k = 1 if agent.actions['move_up'] == 2 else 0.5
-            up += 10 * k
-            if not (self.min_ind and len([p[1] for p in approx_contour if p[1] < 255]) != 0):
-                if not self.agent_hand.top > 16:
-                    self.agent_hand += (0, 0.5 * k)
-                if self.min_ind:
-                    self.world.bodies[self.min_ind].worldCenter[1] += 0.5 * k
-
-        if agent.actions['move_down']:
-            k = 1 if agent.actions['move_down'] == 2 else 0.5
-            up -= 10 * k
-            if not (self.min_ind and len([p[1] for p in approx_contour if p[1] > 435]) != 0):
-                if not self.agent_hand.bottom < 0.1:
-                    self.agent_hand -= (0, 0.5 * k)
-                if self.min_ind:
-                    self.world.bodies[self.min_ind].worldCenter[1] -= 0.5 * k
-
-        self.arm_step['right'] = right
-        self.arm_step['up'] = up
-        return True
+        self.create_bodies(self.world)
 
     def get_imag(self, pixel_array):
         buffer = pygame.PixelArray(pixel_array)
@@ -610,18 +423,6 @@ class AgiProtoFramework(Box2D.examples.framework.FrameworkBase if SERVER else Cu
         buffer = pygame.surfarray.array3d(pixel_array)
         return buffer
 
-    def viewing_the_status(self):
-        grab_dict = {'is_clenched': False,
-                     'is_holding': False}
-        if self.min_ind:
-            grab_dict['is_holding'] = True
-        if self.grab:
-            grab_dict['is_clenched'] = True
-        self.cur_step = {
-            'data': self.cur_step,
-            'mode': grab_dict
-        }
-
     def Step(self, settings):
         for body in self.world.bodies:
             if body.userData:
@@ -638,7 +439,7 @@ class AgiProtoFramework(Box2D.examples.framework.FrameworkBase if SERVER else Cu
             self.last_data = self.cur_step
             self.viewing_the_status()
             # time.sleep(10)
-            self.agent_message = agent.env_step(self.cur_step)
+            self.agent_message = self.agent.env_step(self.cur_step)
             self.current_tick = self.agent_message['current_tick']
 
         elif SERVER:
@@ -654,7 +455,7 @@ class AgiProtoFramework(Box2D.examples.framework.FrameworkBase if SERVER else Cu
             self.last_step = [obj['center'] for obj in self.cur_step]
             self.last_data = self.cur_step
             self.viewing_the_status()
-            self.agent_message = agent.env_step(self.cur_step)
+            self.agent_message = self.agent.env_step(self.cur_step)
             self.Keyboard()
 
         self.num_step += 1
@@ -0,0 +1,216 @@
+import Box2D
+from Box2D import b2CircleShape, b2FixtureDef, b2LoopShape, b2PolygonShape, b2_dynamicBody
+
+
+def our_zoom(vertices):
+    x = vertices[0]
+    y = vertices[1]
+    return x * 10 + 320, (20 - y) * 10 + 240
+
+
+class AgiProtoWorld:
+    """
+    Bodies of the AGI proto room and the way agent actions move the hand and the grabbed body
+    Has no display dependencies, so both the pygame framework and the headless environment are built on it
+    The subclass provides the world, the agent, the agent hand and the contour approximations of ImageProcessor
+    """
+    x_offset = -10
+    y_offset = 10
+    ground_vertices = [(-32, 38), (-32, 0), (32, 0), (32, 38)]
+
+    def create_bodies(self, world):
+        # Ground body
+        ground = world.CreateBody(
+            shapes=b2LoopShape(vertices=self.ground_vertices, )
+        )
+
+        self.init_circle(world)
+        self.init_triangle(world)
+        self.init_teacher(world)
+        # self.init_teacher2(world)
+
+    def init_circle(self, world):
+        fixture = b2FixtureDef(
+            shape=b2CircleShape(radius=2),
+            density=1,
+            restitution=0.5
+        )
+
+        circle = world.CreateBody(
+            type=b2_dynamicBody,
+            position=(10, 2),
+            fixtures=fixture,
+            awake=True,
+            userData='circle'
+        )
+
+    def init_triangle(self, world):
+        vertices = [(0, 0), (-4, 0), (-2, 2), ]
+        vertices = [(2 * x, 2 * y) for x, y in vertices]
+        triangle = b2FixtureDef(
+            shape=b2PolygonShape(vertices=vertices),
+            density=10,
+            restitution=0.2
+        )
+
+        triangle_left = world.CreateBody(
+            type=b2_dynamicBody,
+            position=(self.x_offset, 0),
+            fixtures=triangle,
+            gravityScale=1.0,
+            awake=True,
+            userData='triangle'
+        )
+        triangle_left.My_color = (1, 1, 1)
+
+    def init_teacher(self, world):
+        triangle = b2FixtureDef(
+            # shape=b2PolygonShape(vertices=vertices),
+            shape=b2PolygonShape(box=(1.5, 1.5)),
+            density=10,
+            restitution=0.2
+        )
+        triangle.name = 'Teacher'
+        teacher = world.CreateBody(
+            type=b2_dynamicBody,
+            position=(self.x_offset + 20, 20),
+            fixtures=triangle,
+            gravityScale=0.0,
+            awake=True,
+            userData='Teacher'
+        )
+        teacher.My_color = (1, 2, 1)
+
+    def Keyboard(self, actions: dict = None):
+        """
+        Moves the hand and the grabbed body by :param actions:, the current agent actions by default
+        """
+        if actions is None:
+            actions = self.agent.actions
+        right = 0
+        up = 0
+        rotation = 0
+
+        if self.min_ind:
+            if type(self.world.bodies[self.min_ind].fixtures[0].shape) == Box2D.b2CircleShape:
+                approx_contour = self.get_approx_for_circle(self.world.bodies[self.min_ind])
+            elif type(self.world.bodies[self.min_ind].fixtures[0].shape) == Box2D.Box2D.b2PolygonShape:
+                approx_contour = self.get_approx_for_poly(self.world.bodies[self.min_ind].fixtures[0].shape.vertices,
+                                                          self.world.bodies[self.min_ind].transform.angle,
+                                                          self.world.bodies[self.min_ind].transform.position)
+            approx_contour = [our_zoom(p) for p in approx_contour]
+
+        if self.grab and self.min_ind and actions['grab'] == 0:
+            self.world.bodies[self.min_ind].gravityScale = 1.0
+            self.world.bodies[self.min_ind].linearVelocity[0] = self.arm_step['right']
+            self.world.bodies[self.min_ind].linearVelocity[1] = self.arm_step['up']
+            self.min_ind = None
+            self.grab = False
+
+        elif self.grab and not self.min_ind and actions['grab'] == 0:
+            self.grab = False
+
+        elif not self.grab and actions['grab'] == 1:
+            self.grab = True
+            list_ind = []
+            for ind in range(len(self.world.bodies)):
+                u = our_zoom(self.world.bodies[ind].worldCenter)
+                dist = (abs(self.agent_hand._center[0] - u[0]) +
+                        abs(self.agent_hand._center[1] - u[1]))
+                if dist < 20:
+                    list_ind.append((ind, dist))
+            if len(list_ind) > 0:
+                self.min_ind = 0
+                for ind in range(len(list_ind)):
+                    if list_ind[self.min_ind][1] > list_ind[ind][1]:
+                        self.min_ind = ind
+                self.min_ind = list_ind[self.min_ind][0]
+                self.world.bodies[self.min_ind].gravityScale = 0.0
+                self.world.bodies[self.min_ind].linearVelocity[0] = 0
+                self.world.bodies[self.min_ind].linearVelocity[1] = 0
+
+        # if actions['grab']:
+        #     if self.grab and self.min_ind:
+        #         self.world.bodies[self.min_ind].gravityScale = 1.0
+        #         self.world.bodies[self.min_ind].linearVelocity[0] = self.arm_step['right']
+        #         self.world.bodies[self.min_ind].linearVelocity[1] = self.arm_step['up']
+        #         self.min_ind = None
+        #         self.grab = False
+        #     elif self.grab and not self.min_ind:
+        #         self.grab = False
+        #     else:
+        #         self.grab = True
+        #         list_ind = []
+        #         for ind in range(len(self.world.bodies)):
+        #             u = our_zoom(self.world.bodies[ind].worldCenter)
+        #             dist = (abs(self.hand_rect.center[0] - u[0]) +
+        #                     abs(self.hand_rect.center[1] - u[1]))
+        #             if dist < 20:
+        #                 list_ind.append((ind, dist))
+        #         if len(list_ind) > 0:
+        #             self.min_ind = 0
+        #             for ind in range(len(list_ind)):
+        #                 if list_ind[self.min_ind][1] > list_ind[ind][1]:
+        #                     self.min_ind = ind
+        #             self.min_ind = list_ind[self.min_ind][0]
+        #             self.world.bodies[self.min_ind].gravityScale = 0.0
+        #             self.world.bodies[self.min_ind].linearVelocity[0] = 0
+        #             self.world.bodies[self.min_ind].linearVelocity[1] = 0
+
+        if actions['move_left']:
+            k = 1 if actions['move_left'] == 2 else 0.5
+            right -= 10 * k
+            if not (self.min_ind and len([p[0] for p in approx_contour if p[0] < 3]) != 0):
+                if not self.agent_hand.left < -31.9:
+                    self.agent_hand -= (0.5 * k, 0)
+                if self.min_ind:
+                    self.world.bodies[self.min_ind].worldCenter[0] -= 0.5 * k
+                elif self.push:
+                    self.hand_push = self.hand_push_l
+                    self.push_near_object(val=25)
+
+        if actions['move_right']:
+            k = 1 if actions['move_right'] == 2 else 0.5
+            right += 10 * k
+            if not (self.min_ind and len([p[0] for p in approx_contour if p[0] > 636]) != 0):
+                if not self.agent_hand.right > 31.9:
+                    self.agent_hand += (0.5 * k, 0)
+                if self.min_ind:
+                    self.world.bodies[self.min_ind].worldCenter[0] += 0.5 * k
+                elif self.push:
+                    self.hand_push = self.hand_push_r
+                    self.push_near_object(val=25)
+
+        if actions['move_up']:
+            k = 1 if actions['move_up'] == 2 else 0.5
+            up += 10 * k
+            if not (self.min_ind and len([p[1] for p in approx_contour if p[1] < 255]) != 0):
+                if not self.agent_hand.top > 16:
+                    self.agent_hand += (0, 0.5 * k)
+                if self.min_ind:
+                    self.world.bodies[self.min_ind].worldCenter[1] += 0.5 * k
+
+        if actions['move_down']:
+            k = 1 if actions['move_down'] == 2 else 0.5
+            up -= 10 * k
+            if not (self.min_ind and len([p[1] for p in approx_contour if p[1] > 435]) != 0):
+                if not self.agent_hand.bottom < 0.1:
+                    self.agent_hand -= (0, 0.5 * k)
+                if self.min_ind:
+                    self.world.bodies[self.min_ind].worldCenter[1] -= 0.5 * k
+
+        self.arm_step['right'] = right
+        self.arm_step['up'] = up
+        return True
+
+    def viewing_the_status(self):
+        grab_dict = {'is_clenched': False,
+                     'is_holding': False}
+        if self.min_ind:
+            grab_dict['is_holding'] = True
+        if self.grab:
+            grab_dict['is_clenched'] = True
+        self.cur_step = {
+            'data': self.cur_step,
+            'mode': grab_dict
+        }
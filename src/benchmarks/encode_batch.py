@@ -0,0 +1,79 @@
+"""
+Compares EncoderArea.encode_batch with a loop over recognize_process_input on a corpus of recorded-like patterns
+Run from the src directory: python -m benchmarks.encode_batch [num_inputs ...]
+"""
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+from agent import Agent
+from neuro.areas.encoder_area import EncoderArea
+from neuro.neural_pattern import NeuralPattern
+from neuro.pattern_registry import PatternRegistry
+from neuro.neural_zone import NeuralZone
+
+space_size = 2000
+value_size = 40
+inputs_per_prototype = 20
+shift_coefficients = [0.0, 0.0, 0.05, 0.1]
+
+
+def change_pattern(pattern, coefficient):
+    new_value = random.sample(pattern.value, pattern.value_size - int(pattern.value_size * coefficient))
+    while len(new_value) < pattern.value_size:
+        val = random.randrange(pattern.space_size)
+        if val not in new_value:
+            new_value.append(val)
+    new_value.sort()
+    new_pattern = NeuralPattern.find_or_create(
+        space_size=pattern.space_size, value=new_value, registry=pattern.registry)
+    new_pattern.source_area = pattern.source_area
+    return new_pattern
+
+
+def make_corpus(num_inputs):
+    random.seed(1)
+    source_area = SimpleNamespace(name='receptive')
+    registry = PatternRegistry(capacity=num_inputs)
+    prototypes = []
+    for _ in range(max(1, num_inputs // inputs_per_prototype)):
+        prototype = NeuralPattern(space_size, value_size, generate_inplace=True, registry=registry)
+        prototype.source_area = source_area
+        prototypes.append(prototype)
+    return [change_pattern(random.choice(prototypes), random.choice(shift_coefficients)) for _ in range(num_inputs)]
+
+
+def make_area():
+    agent = Agent()
+    zone = NeuralZone(name='benchmark', agent=agent)
+    return EncoderArea.add(name='representations', agent=agent, zone=zone)
+
+
+def run(num_inputs):
+    corpus = make_corpus(num_inputs)
+
+    area = make_area()
+    start = time.perf_counter()
+    loop_results = [area.recognize_process_input(pattern) for pattern in corpus]
+    loop_time = time.perf_counter() - start
+
+    area = make_area()
+    start = time.perf_counter()
+    batch_results = area.encode_batch(corpus)
+    batch_time = time.perf_counter() - start
+
+    loop_new = len([r for r in loop_results if r[1]])
+    batch_new = len([r for r in batch_results if r[1]])
+    print(f'inputs={num_inputs}: loop {loop_time:7.2f}s ({loop_new} new), '
+          f'batch {batch_time:7.2f}s ({batch_new} new), speedup x{loop_time / batch_time:.1f}')
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10000, 100000]
+    for num_inputs in sizes:
+        run(num_inputs)
+
+
+if __name__ == '__main__':
+    main()
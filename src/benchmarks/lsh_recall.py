@@ -0,0 +1,84 @@
+"""
+Measures recall, latency and index memory of the approximate (LSH) recognition index against the exact one
+Run from the src directory: python -m benchmarks.lsh_recall [num_patterns ...]
+"""
+import random
+import sys
+import time
+import tracemalloc
+
+from neuro.hyper_params import HyperParameters
+from neuro.inverted_pattern_index import InvertedPatternIndex
+from neuro.lsh_pattern_index import LshPatternIndex
+from neuro.neural_pattern import NeuralPattern
+from neuro.pattern_registry import PatternRegistry
+
+num_queries = 1000
+recognition_threshold = 0.9
+shift_coefficients = [0.0, 0.05, 0.1, 0.15, 0.3]
+
+
+def change_pattern(pattern, coefficient):
+    new_value = random.sample(pattern.value, pattern.value_size - int(pattern.value_size * coefficient))
+    while len(new_value) < pattern.value_size:
+        val = random.randrange(pattern.space_size)
+        if val not in new_value:
+            new_value.append(val)
+    new_value.sort()
+    return NeuralPattern(space_size=pattern.space_size, value=new_value, registry=pattern.registry)
+
+
+def build(index, patterns):
+    tracemalloc.start()
+    start = time.perf_counter()
+    for i, pattern in enumerate(patterns):
+        index.add(pattern, i)
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, size
+
+
+def query(index, queries):
+    start = time.perf_counter()
+    found = [index.find(q, recognition_threshold) for q in queries]
+    return (time.perf_counter() - start) / len(queries), found
+
+
+def run(num_patterns: int):
+    space_size = HyperParameters.encoder_space_size
+    value_size = HyperParameters.encoder_norm
+    registry = PatternRegistry(capacity=num_patterns + num_queries)
+    patterns = [NeuralPattern(space_size, value=sorted(random.sample(range(space_size), value_size)), registry=registry)
+                for _ in range(num_patterns)]
+    queries = [change_pattern(random.choice(patterns), random.choice(shift_coefficients))
+               for _ in range(num_queries)]
+
+    exact = InvertedPatternIndex()
+    lsh = LshPatternIndex(bands=HyperParameters.lsh_bands, rows=HyperParameters.lsh_rows)
+    print(f'patterns={num_patterns}, bands={lsh.bands}, rows={lsh.rows}, threshold={recognition_threshold}')
+    for name, index in [('exact', exact), ('lsh', lsh)]:
+        build_time, size = build(index, patterns)
+        print(f'{name:>6}: build {build_time:7.2f}s, index memory {size / num_patterns:6.0f} bytes/pattern')
+
+    exact_latency, exact_found = query(exact, queries)
+    lsh_latency, lsh_found = query(lsh, queries)
+    # an exact match exists if the exact index found one, recall is the share of them LSH finds as well
+    matches = [(e, l) for e, l in zip(exact_found, lsh_found) if e is not None]
+    recalled = len([l for e, l in matches if l is not None])
+    recall = recalled / len(matches) if matches else 1.0
+    false_positives = len([l for e, l in zip(exact_found, lsh_found) if e is None and l is not None])
+    print(f' exact: {exact_latency * 1e6:8.1f}us/query')
+    print(f'   lsh: {lsh_latency * 1e6:8.1f}us/query, recall {recall:.3f} ({recalled}/{len(matches)}), '
+          f'false positives {false_positives}')
+
+
+def main():
+    random.seed(0)
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10000, 100000]
+    for num_patterns in sizes:
+        run(num_patterns)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+"""
+Compares the compiled step schedule of Network with the generic iteration over zones, areas and connections,
+and the event-driven area updates on top of the compiled schedule
+Run from the src directory: python -m benchmarks.network_step [num_ticks]
+"""
+import sys
+import time
+
+from agent import Agent
+
+
+def measure(use_compiled_schedule: bool, num_ticks: int, event_driven: bool = False) -> float:
+    agent = Agent()
+    agent.network.use_compiled_schedule = use_compiled_schedule
+    agent.network.event_driven = event_driven
+    start = time.perf_counter()
+    for _ in range(num_ticks):
+        agent.network.step()
+    return num_ticks / (time.perf_counter() - start)
+
+
+def main():
+    num_ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    schedule = Agent().network.schedule
+    print(f'compiled schedule: {len(schedule)} calls per tick, {schedule.num_dropped} no-ops dropped')
+    generic = measure(False, num_ticks)
+    compiled = measure(True, num_ticks)
+    print(f'generic  {generic:9.0f} ticks/s')
+    print(f'compiled {compiled:9.0f} ticks/s, speedup x{compiled / generic:.2f}')
+    event_driven = measure(True, num_ticks, event_driven=True)
+    print(f'compiled, event-driven {event_driven:9.0f} ticks/s, speedup x{event_driven / generic:.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+Measures the memory taken by neural patterns, including their entries in the pattern registry
+The compact layout is compared with the legacy one, a pattern with a __dict__, a list value,
+an eagerly allocated history and source patterns, indexed by a frozenset of its value
+Memory is taken from the peak resident set size, so every layout is measured in its own process
+Run from the src directory: python -m benchmarks.pattern_memory [num_patterns] [--layout compact|legacy]
+"""
+import argparse
+import gc
+import random
+import subprocess
+import sys
+import time
+import resource
+
+from neuro.hyper_params import HyperParameters
+from neuro.neural_pattern import NeuralPattern
+from neuro.pattern_registry import PatternRegistry
+
+LAYOUTS = ('legacy', 'compact')
+
+
+class LegacyPattern:
+    """
+    The pattern layout before NeuralPattern got __slots__ and an array-backed value
+    """
+    def __init__(self, space_size: int, value_size: int, pattern_id: int):
+        self.value = sorted(random.sample(range(space_size), value_size))
+        self.value_size = value_size
+        self.data = None
+        self.source_patterns = []
+        self.source_area = None
+        self.space_size = space_size
+        self.history = {}
+        self._bits = None
+        self._id = pattern_id
+
+
+def make_legacy_patterns(num_patterns: int) -> list:
+    patterns = []
+    index = {}
+    for i in range(num_patterns):
+        pattern = LegacyPattern(HyperParameters.encoder_space_size, HyperParameters.encoder_norm, i)
+        patterns.append(pattern)
+        index.setdefault((pattern.space_size, pattern.value_size, frozenset(pattern.value)), pattern)
+    return patterns
+
+
+def make_compact_patterns(num_patterns: int) -> list:
+    # large enough to keep every pattern indexed
+    registry = PatternRegistry(capacity=num_patterns)
+    return [NeuralPattern(HyperParameters.encoder_space_size, HyperParameters.encoder_norm, generate_inplace=True,
+                          registry=registry)
+            for _ in range(num_patterns)]
+
+
+def peak_memory() -> int:
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def measure(layout: str, num_patterns: int):
+    random.seed(0)
+    gc.collect()
+    start_memory = peak_memory()
+    start = time.perf_counter()
+    if layout == 'legacy':
+        patterns = make_legacy_patterns(num_patterns)
+    else:
+        patterns = make_compact_patterns(num_patterns)
+    elapsed = time.perf_counter() - start
+    memory = peak_memory() - start_memory
+    print(f'{layout}: {len(patterns)} patterns, {memory / len(patterns):.0f} bytes per pattern, '
+          f'{memory / 2 ** 20:.0f} MiB in total, created in {elapsed:.1f}s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Memory taken by neural patterns')
+    parser.add_argument('num_patterns', type=int, nargs='?', default=10 ** 6)
+    parser.add_argument('--layout', choices=LAYOUTS, default=None, help='measures one layout, both by default')
+    args = parser.parse_args()
+    if args.layout:
+        measure(args.layout, args.num_patterns)
+        return
+    for layout in LAYOUTS:
+        subprocess.run([sys.executable, '-m', 'benchmarks.pattern_memory', str(args.num_patterns), '--layout', layout],
+                       check=True)
+
+
+if __name__ == '__main__':
+    main()
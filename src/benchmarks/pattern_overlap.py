@@ -0,0 +1,76 @@
+"""
+Compares set-based and bit-packed overlap of neural patterns
+Run from the src directory: python -m benchmarks.pattern_overlap
+"""
+import random
+import time
+
+from neuro.hyper_params import HyperParameters
+from neuro.neural_pattern import NeuralPattern
+from neuro.pattern_registry import PatternRegistry
+
+num_patterns = 2000
+num_pairs = 200000
+
+
+def set_equal(pattern1, pattern2):
+    if pattern1.value_size != pattern2.value_size or pattern1.space_size != pattern2.space_size:
+        return False
+    intersection = set(pattern1.value) & set(pattern2.value)
+    return len(intersection) == pattern1.value_size
+
+
+def set_similarity(pattern1, pattern2):
+    if pattern1.value_size != pattern2.value_size or pattern1.space_size != pattern2.space_size:
+        return 0
+    intersection = set(pattern1.value) & set(pattern2.value)
+    return len(intersection) / pattern1.value_size
+
+
+def change_pattern(pattern, coefficient):
+    new_value = random.sample(pattern.value, pattern.value_size - int(pattern.value_size * coefficient))
+    while len(new_value) < pattern.value_size:
+        val = random.randrange(pattern.space_size)
+        if val not in new_value:
+            new_value.append(val)
+    new_value.sort()
+    return NeuralPattern(space_size=pattern.space_size, value=new_value, registry=pattern.registry)
+
+
+def make_pairs():
+    space_size = HyperParameters.encoder_space_size
+    value_size = HyperParameters.encoder_norm
+    registry = PatternRegistry()
+    patterns = [NeuralPattern(space_size, value_size, generate_inplace=True, registry=registry)
+                for _ in range(num_patterns)]
+    # a share of near-duplicates so that both branches of the comparisons are exercised
+    patterns.extend([change_pattern(p, random.choice([0.0, 0.1, 0.3])) for p in patterns[:num_patterns // 2]])
+    return [(random.choice(patterns), random.choice(patterns)) for _ in range(num_pairs)]
+
+
+def measure(func, pairs):
+    start = time.perf_counter()
+    result = [func(p1, p2) for p1, p2 in pairs]
+    return time.perf_counter() - start, result
+
+
+def main():
+    random.seed(0)
+    pairs = make_pairs()
+    # packing is done once per pattern and cached, keep it out of the timed loop
+    for p1, p2 in pairs:
+        _ = p1.bits, p2.bits
+
+    print(f'space_size={HyperParameters.encoder_space_size}, norm={HyperParameters.encoder_norm}, pairs={num_pairs}')
+    for name, legacy, packed in [
+        ('equality', set_equal, NeuralPattern.__eq__),
+        ('similarity', set_similarity, NeuralPattern.similarity),
+    ]:
+        legacy_time, legacy_result = measure(legacy, pairs)
+        packed_time, packed_result = measure(packed, pairs)
+        assert legacy_result == packed_result, f'{name}: results differ'
+        print(f'{name:>10}: sets {legacy_time:6.3f}s, bits {packed_time:6.3f}s, speedup x{legacy_time / packed_time:.1f}')
+
+
+if __name__ == '__main__':
+    main()
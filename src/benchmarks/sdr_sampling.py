@@ -0,0 +1,113 @@
+"""
+Compares the list/Counter activation sampling of SDRProcessor with the NumPy one:
+throughput and the distribution of the produced sparse patterns
+Run from the src directory: python -m benchmarks.sdr_sampling
+"""
+import collections
+import random
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from neuro.highway_connections import HighwayConnections
+from neuro.hyper_params import HyperParameters
+from neuro.neural_pattern import NeuralPattern
+from neuro.pattern_registry import PatternRegistry
+from neuro.sdr_processor import SDRProcessor
+
+num_encodes = 3000
+input_space_size = 2000
+input_norm = 40
+
+
+def legacy_sample_activations(area, pattern, connections):
+    output_norm = area.output_norm
+    target_cells_activated = []
+    activated_connections = []
+    for idx in pattern.value:
+        outgoing_activations = [c for c in connections[idx] if random.randint(0, 99) < 10]
+        outgoing_activations.extend([c[1] for c in area.highway_connections if c[0] == idx])  # stays empty here
+        activated_connections.extend([(idx, target) for target in outgoing_activations])
+        target_cells_activated.extend(outgoing_activations)
+
+    counters = list(collections.Counter(target_cells_activated).items())
+    counters.sort(key=lambda x: x[1], reverse=True)
+    if counters[0][1] > 2:
+        result = [c[0] for c in counters if c[1] > 2]
+        if len(result) >= output_norm:
+            return result[:output_norm], activated_connections
+        with_high_potential = [c[0] for c in counters if c[1] == 2]
+        if len(result) + len(with_high_potential) >= output_norm:
+            return result + random.sample(with_high_potential, output_norm - len(result)), activated_connections
+    else:
+        result = [c[0] for c in counters if c[1] > 1]
+        if len(result) >= output_norm:
+            return result, activated_connections
+    return None, None
+
+
+def legacy_encode(area, pattern, connections):
+    while True:
+        output, _ = legacy_sample_activations(area, pattern, connections)
+        if output:
+            if len(output) > area.output_norm:
+                output = random.sample(output, area.output_norm)
+            return sorted(output)
+
+
+def numpy_encode(processor, pattern):
+    output, _ = processor._get_raw_output(pattern)
+    return output
+
+
+def frequencies(outputs, space_size):
+    counts = np.bincount(np.concatenate(outputs), minlength=space_size)
+    return counts / counts.sum()
+
+
+def total_variation(p, q):
+    return 0.5 * np.abs(p - q).sum()
+
+
+def make_area():
+    return SimpleNamespace(
+        output_space_size=HyperParameters.encoder_space_size,
+        output_norm=HyperParameters.encoder_norm,
+        connections=None,
+        highway_connections=HighwayConnections(),
+        container=SimpleNamespace(pattern_registry=PatternRegistry()),
+    )
+
+
+def main():
+    random.seed(0)
+    area = make_area()
+    pattern = NeuralPattern(input_space_size, input_norm, generate_inplace=True,
+                            registry=area.container.pattern_registry)
+    processor = SDRProcessor(area)
+    processor._get_raw_output(pattern)
+    # both implementations sample over the same connections table
+    connections = area.connections.tolist()
+
+    start = time.perf_counter()
+    legacy_outputs = [legacy_encode(area, pattern, connections) for _ in range(num_encodes)]
+    legacy_time = time.perf_counter() - start
+    reference_outputs = [legacy_encode(area, pattern, connections) for _ in range(num_encodes)]
+
+    start = time.perf_counter()
+    numpy_outputs = [numpy_encode(processor, pattern) for _ in range(num_encodes)]
+    numpy_time = time.perf_counter() - start
+
+    space_size = area.output_space_size
+    legacy_freq = frequencies(legacy_outputs, space_size)
+    print(f'encodes={num_encodes}, input {input_norm}/{input_space_size}, output {area.output_norm}/{space_size}')
+    print(f'legacy: {legacy_time / num_encodes * 1e6:8.1f}us/encode')
+    print(f' numpy: {numpy_time / num_encodes * 1e6:8.1f}us/encode, speedup x{legacy_time / numpy_time:.1f}')
+    print(f'output cell frequency TV distance: legacy vs legacy '
+          f'{total_variation(legacy_freq, frequencies(reference_outputs, space_size)):.4f}, '
+          f'legacy vs numpy {total_variation(legacy_freq, frequencies(numpy_outputs, space_size)):.4f}')
+
+
+if __name__ == '__main__':
+    main()
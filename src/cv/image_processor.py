@@ -29,10 +29,8 @@ class ImageProcessor(RoiAnalysis):
         self.ALPHA = 180 / np.arccos(-1)
         self.my_world = world
         self.img = filename
-        self.arm_size = arm_size
         self.pi_alpha = np.pi / 180
-        if self.server:
-            self.agent_hand = [our_zoom(point) for point in arm]
+        self.set_arm(arm_size, arm)
         self.hand_polygon = np.array([[12,  0],
                                       [10, 14],
                                       [ 6,  3],
@@ -46,6 +44,14 @@ class ImageProcessor(RoiAnalysis):
                                       [21,  4],
                                       [15, 14]])
 
+    def set_arm(self, arm_size=(0, 0, 0, 0), arm=None):
+        """
+        Moves the hand, so one processor serves all the steps of a world
+        """
+        self.arm_size = arm_size
+        if self.server:
+            self.agent_hand = [our_zoom(point) for point in arm]
+
     def mean(self, lst: list) -> float:
         return sum(lst) / len(lst)
 
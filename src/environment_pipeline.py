@@ -0,0 +1,231 @@
+import multiprocessing
+import queue
+import threading
+import time
+from types import SimpleNamespace
+
+from agent import ACTIONS
+from cv.image_processor import ImageProcessor
+
+# seconds a stage waits on a queue before checking that the stages feeding it are alive
+POLL_INTERVAL = 1.0
+
+
+def queue_depth(items) -> int:
+    try:
+        return items.qsize()
+    except NotImplementedError:
+        # multiprocessing queues don't report their size on macOS
+        return 0
+
+
+def snapshot_world(world) -> SimpleNamespace:
+    """
+    Picklable copy of the body attributes ImageProcessor reads, so the vision stage can run in another process
+    """
+    bodies = []
+    for body in world.bodies:
+        fixtures = [SimpleNamespace(shape=SimpleNamespace(radius=getattr(fixture.shape, 'radius', None),
+                                                          vertices=list(getattr(fixture.shape, 'vertices', ()))))
+                    for fixture in body.fixtures]
+        bodies.append(SimpleNamespace(
+            userData=body.userData,
+            worldCenter=tuple(body.worldCenter),
+            transform=SimpleNamespace(angle=body.transform.angle, position=tuple(body.transform.position)),
+            fixtures=fixtures,
+        ))
+    return SimpleNamespace(bodies=bodies)
+
+
+def run_vision_stage(snapshots, packets):
+    """
+    Vision process: turns world snapshots into agent packets, in tick order
+    Gets (tick, world, arm_size, hand contour, mode) items and puts (tick, packet, seconds, input queue depth),
+    None ends the stage
+    """
+    image_processor = None
+    last_step = None
+    last_data = None
+    while True:
+        depth = queue_depth(snapshots)
+        item = snapshots.get()
+        if item is None:
+            packets.put(None)
+            return
+        tick, world, arm_size, hand_contour, mode = item
+        start = time.perf_counter()
+        if image_processor is None:
+            image_processor = ImageProcessor(world, server=True, arm_size=arm_size, arm=hand_contour)
+        image_processor.my_world = world
+        image_processor.set_arm(arm_size, hand_contour)
+        data = image_processor.run(last_step, last_data)
+        last_step = [obj['center'] for obj in data]
+        last_data = data
+        packets.put((tick, {'data': data, 'mode': mode}, time.perf_counter() - start, depth))
+
+
+class StageStopped(Exception):
+    """
+    Raised in the physics stage once the pipeline stops before all the ticks ran
+    """
+
+
+def put_until_stopped(items, item, stop: threading.Event):
+    while True:
+        try:
+            items.put(item, timeout=POLL_INTERVAL)
+            return
+        except queue.Full:
+            if stop.is_set():
+                raise StageStopped()
+
+
+def get_until_stopped(items, stop: threading.Event):
+    while True:
+        try:
+            return items.get(timeout=POLL_INTERVAL)
+        except queue.Empty:
+            if stop.is_set():
+                raise StageStopped()
+
+
+class StageStats:
+    """
+    Items a pipeline stage processed, the time it was busy and the depth of its input queue
+    """
+    def __init__(self, name: str):
+        self.name = name
+        self.num_items = 0
+        self.busy_seconds = 0.0
+        self.depth_sum = 0
+        self.max_depth = 0
+
+    def record(self, seconds: float, depth: int):
+        self.num_items += 1
+        self.busy_seconds += seconds
+        self.depth_sum += depth
+        self.max_depth = max(self.max_depth, depth)
+
+    def report(self, seconds: float) -> dict:
+        return {
+            'ticks': self.num_items,
+            'busy_seconds': self.busy_seconds,
+            'ticks_per_second': self.num_items / self.busy_seconds if self.busy_seconds else 0.0,
+            'utilization': self.busy_seconds / seconds if seconds else 0.0,
+            'mean_queue_depth': self.depth_sum / self.num_items if self.num_items else 0.0,
+            'max_queue_depth': self.max_depth,
+        }
+
+
+class EnvironmentPipeline:
+    """
+    Runs a headless environment as three stages connected by bounded queues:
+    physics on a thread, vision in a separate process, since sympy and shapely hold the GIL,
+    and the agent on the calling thread
+    The physics step out of tick t applies the actions the agent produced on tick t - lag_tolerance,
+    so the stages overlap by lag_tolerance ticks and the actions are applied the same way on every run
+    With lag_tolerance 0 the actions are applied as in HeadlessEnvironment.step, with no overlap of the agent
+    with the other stages. Packets come from another process, so in-place changes the agent makes
+    to body dicts don't reach the packets of later ticks
+    """
+    def __init__(self, environment, lag_tolerance: int = 2, queue_size: int = 2):
+        if lag_tolerance < 0:
+            raise ValueError('lag_tolerance must not be negative')
+        self.environment = environment
+        self.lag_tolerance = lag_tolerance
+        self.queue_size = queue_size
+        self.stats = {}
+        self._physics_error = None
+        # set when the agent stage ends, so the physics thread doesn't wait for actions that never come
+        self._stop = threading.Event()
+
+    def _snapshot(self, tick: int) -> tuple:
+        environment = self.environment
+        mode = {'is_clenched': bool(environment.grab), 'is_holding': bool(environment.min_ind)}
+        return (tick, snapshot_world(environment.world), environment.arm_size(),
+                environment.agent_hand.hand_contour.copy(), mode)
+
+    def _run_physics(self, num_ticks: int, snapshots, actions):
+        environment = self.environment
+        no_actions = {action: 0 for action in ACTIONS}
+        try:
+            put_until_stopped(snapshots, self._snapshot(0), self._stop)
+            for tick in range(num_ticks - 1):
+                depth = queue_depth(actions)
+                tick_actions = get_until_stopped(actions, self._stop) if tick >= self.lag_tolerance else no_actions
+                start = time.perf_counter()
+                for body in environment.world.bodies:
+                    if body.userData:
+                        body.awake = True
+                environment.Keyboard(tick_actions)
+                environment.num_step += 1
+                environment.world.Step(1.0 / environment.hz,
+                                       environment.velocity_iterations, environment.position_iterations)
+                environment.world.ClearForces()
+                snapshot = self._snapshot(tick + 1)
+                self.stats['physics'].record(time.perf_counter() - start, depth)
+                put_until_stopped(snapshots, snapshot, self._stop)
+        except StageStopped:
+            return
+        except Exception as ex:
+            self._physics_error = ex
+        try:
+            put_until_stopped(snapshots, None, self._stop)
+        except StageStopped:
+            pass
+
+    def _get_packet(self, packets, vision_process):
+        while True:
+            try:
+                return packets.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                if not vision_process.is_alive():
+                    raise RuntimeError('The vision stage stopped unexpectedly')
+
+    def run(self, num_ticks: int) -> dict:
+        """
+        Runs :param num_ticks: environment ticks through the pipeline
+        :return: overall ticks per second and the throughput and input queue depth of every stage
+        """
+        environment = self.environment
+        self.stats = {name: StageStats(name) for name in ('physics', 'vision', 'agent')}
+        self._physics_error = None
+        self._stop.clear()
+        snapshots = multiprocessing.Queue(maxsize=self.queue_size)
+        packets = multiprocessing.Queue(maxsize=self.queue_size)
+        # physics takes the actions of tick t - lag_tolerance before it produces the packet of tick t + 1,
+        # so at most lag_tolerance + 1 actions wait and the agent never blocks on a put
+        actions = queue.Queue(maxsize=self.lag_tolerance + 1)
+        vision_process = multiprocessing.Process(target=run_vision_stage, args=(snapshots, packets), daemon=True)
+        vision_process.start()
+        physics_thread = threading.Thread(target=self._run_physics, args=(num_ticks, snapshots, actions), daemon=True)
+        start = time.perf_counter()
+        physics_thread.start()
+        try:
+            for _ in range(num_ticks):
+                depth = queue_depth(packets)
+                item = self._get_packet(packets, vision_process)
+                if item is None:
+                    raise RuntimeError('The physics stage stopped unexpectedly') from self._physics_error
+                _, packet, vision_seconds, vision_depth = item
+                self.stats['vision'].record(vision_seconds, vision_depth)
+                agent_start = time.perf_counter()
+                environment.cur_step = packet
+                environment.agent_message = (environment.recorder or environment.agent).env_step(packet)
+                actions.put_nowait(dict(environment.agent_message['actions']))
+                self.stats['agent'].record(time.perf_counter() - agent_start, depth)
+            seconds = time.perf_counter() - start
+            physics_thread.join()
+            vision_process.join()
+        finally:
+            self._stop.set()
+            physics_thread.join()
+            if vision_process.is_alive():
+                vision_process.terminate()
+        return {
+            'ticks': num_ticks,
+            'seconds': seconds,
+            'ticks_per_second': num_ticks / seconds if seconds else 0.0,
+            'lag_tolerance': self.lag_tolerance,
+            'stages': {name: stats.report(seconds) for name, stats in self.stats.items()},
+        }
@@ -0,0 +1,211 @@
+"""
+Runs independent agents, each one in its own Box2D world, on a process pool and collects their per-tick metrics
+Every run gets its own seed and hyperparameter overrides, a sweep runs every seed with every combination of values
+Run from the src directory:
+    python -m experiment_runner --ticks 5000 --seeds 0 1 2 3 --set learning_rate=0.1 --sweep history_retention=8,16
+"""
+import argparse
+import ast
+import itertools
+import json
+import multiprocessing
+import os
+import queue
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+
+from agent import ACTIONS, Agent
+from headless_environment import HeadlessEnvironment
+from neuro.hyper_params import HyperParameters
+from utils import path_from_root
+
+# ticks a worker accumulates before sending their metrics to the parent
+METRICS_BATCH_SIZE = 100
+METRIC_NAMES = ['step', 'surprise', 'dopamine', 'reflexes'] + ACTIONS
+
+
+class ExperimentRun:
+    """
+    One agent of an experiment: its seed and the hyperparameters it overrides
+    """
+    def __init__(self, run_id: int, seed: int, overrides: dict = None):
+        self.run_id = run_id
+        self.seed = seed
+        self.overrides = overrides or {}
+
+    @property
+    def log_filename(self) -> str:
+        return os.path.join(path_from_root('logs'), f'run_{self.run_id}.txt')
+
+    def to_dict(self) -> dict:
+        return {'run_id': self.run_id, 'seed': self.seed, 'overrides': self.overrides}
+
+    def __repr__(self):
+        return f'run #{self.run_id} (seed {self.seed}, {self.overrides})'
+
+
+def collect_metrics(step: int, agent: Agent, message: dict, last_tick: int) -> tuple:
+    """
+    Metrics of one environment step as a tuple ordered like METRIC_NAMES
+    :param last_tick: network tick the previous environment step ended on
+    """
+    dopamine = sum(portion.value
+                   for _, portions in agent.dopamine_flow.range(last_tick + 1, agent.network.current_tick + 1)
+                   for portion in portions)
+    actions = tuple(message['actions'][action] for action in ACTIONS)
+    return (step, message['surprise'], dopamine, agent.reflex.num_reflexes()) + actions
+
+
+def run_experiment(run: ExperimentRun, num_ticks: int, metrics_queue) -> dict:
+    """
+    Worker entry point: steps one agent with its world for :param num_ticks: environment ticks
+    Per-tick metrics go to :param metrics_queue: in batches of (run_id, records)
+    """
+    with HyperParameters.override(**run.overrides):
+        agent = Agent(seed=run.seed, log_filename=run.log_filename)
+        environment = HeadlessEnvironment(agent)
+        batch = []
+        start = time.perf_counter()
+        for step in range(num_ticks):
+            last_tick = agent.network.current_tick
+            message = environment.step()
+            batch.append(collect_metrics(step, agent, message, last_tick))
+            if len(batch) >= METRICS_BATCH_SIZE:
+                metrics_queue.put((run.run_id, batch))
+                batch = []
+        seconds = time.perf_counter() - start
+        if batch:
+            metrics_queue.put((run.run_id, batch))
+        agent.network.close()
+    return {
+        'run_id': run.run_id,
+        'ticks': num_ticks,
+        'seconds': seconds,
+        'ticks_per_second': num_ticks / seconds if seconds else 0.0,
+    }
+
+
+def make_runs(seeds: list, overrides: dict = None, sweep: dict = None) -> list:
+    """
+    One run per seed and combination of the :param sweep: values, on top of the common :param overrides:
+    """
+    overrides = overrides or {}
+    sweep = sweep or {}
+    names = list(sweep)
+    runs = []
+    for values in itertools.product(*(sweep[name] for name in names)):
+        for seed in seeds:
+            run_overrides = dict(overrides)
+            run_overrides.update(zip(names, values))
+            # fails early on unknown names instead of in every worker
+            with HyperParameters.override(**run_overrides):
+                pass
+            runs.append(ExperimentRun(len(runs), seed, run_overrides))
+    return runs
+
+
+def summarize(metrics: dict) -> dict:
+    num_ticks = len(metrics['step'])
+    return {
+        'mean_surprise': sum(metrics['surprise']) / num_ticks if num_ticks else 0.0,
+        'total_dopamine': sum(metrics['dopamine']),
+        'reflexes': metrics['reflexes'][-1] if num_ticks else 0,
+        'actions': {action: sum(1 for value in metrics[action] if value) for action in ACTIONS},
+    }
+
+
+def _drain(metrics_queue, metrics: dict, timeout: float = 0.0):
+    try:
+        run_id, records = metrics_queue.get(timeout=timeout) if timeout else metrics_queue.get_nowait()
+        while True:
+            columns = metrics[run_id]
+            for record in records:
+                for name, value in zip(METRIC_NAMES, record):
+                    columns[name].append(value)
+            run_id, records = metrics_queue.get_nowait()
+    except queue.Empty:
+        pass
+
+
+def run_experiments(runs: list, num_ticks: int, max_workers: int = None, output_filename: str = None) -> dict:
+    """
+    Runs the experiments on a process pool and writes the aggregated result to :param output_filename:
+    :return: the aggregated result, per-tick metrics are stored column-wise
+    """
+    metrics = {run.run_id: {name: [] for name in METRIC_NAMES} for run in runs}
+    results = {}
+    start = time.perf_counter()
+    with multiprocessing.Manager() as manager, ProcessPoolExecutor(max_workers=max_workers) as executor:
+        metrics_queue = manager.Queue()
+        futures = {executor.submit(run_experiment, run, num_ticks, metrics_queue): run for run in runs}
+        pending = set(futures)
+        while pending:
+            _drain(metrics_queue, metrics, timeout=0.5)
+            done, pending = wait(pending, timeout=0)
+            for future in done:
+                result = future.result()
+                results[result['run_id']] = result
+                print(f'{futures[future]} done: {result["ticks_per_second"]:.1f} ticks/s')
+        _drain(metrics_queue, metrics)
+    seconds = time.perf_counter() - start
+
+    aggregated = {
+        'num_ticks': num_ticks,
+        'workers': max_workers or os.cpu_count(),
+        'seconds': seconds,
+        'ticks_per_second': len(runs) * num_ticks / seconds if seconds else 0.0,
+        'runs': [
+            dict(run.to_dict(), **results[run.run_id], summary=summarize(metrics[run.run_id]),
+                 metrics=metrics[run.run_id])
+            for run in runs
+        ],
+    }
+    if output_filename:
+        with open(output_filename, 'w', encoding='utf-8') as file:
+            json.dump(aggregated, file)
+    return aggregated
+
+
+def _parse_value(text: str):
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        return text
+
+
+def _parse_assignments(assignments: list, multiple: bool = False) -> dict:
+    values = {}
+    for assignment in assignments:
+        name, _, text = assignment.partition('=')
+        if multiple:
+            values[name] = [_parse_value(item) for item in text.split(',')]
+        else:
+            values[name] = _parse_value(text)
+    return values
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Runs independent agents on a process pool')
+    parser.add_argument('--ticks', type=int, default=1000, help='environment ticks per run')
+    parser.add_argument('--seeds', type=int, nargs='+', default=[0])
+    parser.add_argument('--set', action='append', default=[], metavar='NAME=VALUE',
+                        help='hyperparameter override applied to every run')
+    parser.add_argument('--sweep', action='append', default=[], metavar='NAME=V1,V2',
+                        help='hyperparameter values to run every seed with')
+    parser.add_argument('--workers', type=int, default=None, help='processes, all cores by default')
+    parser.add_argument('--output', default=None, help='aggregated result file')
+    args = parser.parse_args()
+
+    runs = make_runs(args.seeds, _parse_assignments(args.set), _parse_assignments(args.sweep, multiple=True))
+    output_filename = args.output or os.path.join(path_from_root('logs'), f'experiments_{int(time.time())}.json')
+    aggregated = run_experiments(runs, args.ticks, args.workers, output_filename)
+    for run in aggregated['runs']:
+        summary = run['summary']
+        print(f'run #{run["run_id"]} seed {run["seed"]} {run["overrides"]}: '
+              f'mean surprise {summary["mean_surprise"]:.3f}, dopamine {summary["total_dopamine"]:.2f}, '
+              f'reflexes {summary["reflexes"]}')
+    print(f'{len(runs)} runs, {aggregated["ticks_per_second"]:.1f} ticks/s in total, written to {output_filename}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+import time
+
+from Box2D import b2World
+
+from agent import Agent
+from agent_hand import AgentHand
+from agi_proto_world import AgiProtoWorld
+from cv.image_processor import ImageProcessor
+from packet_recording import PacketRecorder
+
+
+class HeadlessEnvironment(AgiProtoWorld):
+    """
+    The AGI proto room without pygame, fonts, GUI or a frame rate limit
+    Owns the Box2D world, the agent hand, the image processor and the agent, and steps them as fast as the CPU allows
+    """
+    # physics settings of the Box2D example framework the pygame version runs on
+    hz = 60.0
+    velocity_iterations = 8
+    position_iterations = 3
+
+    def __init__(self, agent: Agent = None, recording_filename: str = None):
+        """
+        :param recording_filename: if given, the packets the agent receives are recorded to this file
+        """
+        self.agent = agent if agent is not None else Agent()
+        self.recorder = PacketRecorder(self.agent, recording_filename) if recording_filename else None
+        self.world = b2World(gravity=(0, -10), doSleep=True)
+        self.create_bodies(self.world)
+        self.agent_hand = AgentHand()
+        self.agent_hand += (9.1, 6)
+        self.image_processor = ImageProcessor(self.world, server=True, arm_size=self.arm_size(),
+                                              arm=self.agent_hand.hand_contour)
+        self.arm_step = {'right': 0, 'up': 0}
+        self.grab = False
+        self.min_ind = False
+        self.push = False
+        self.num_step = 0
+        self.last_step = None
+        self.last_data = None
+        self.cur_step = None
+        self.agent_message = {'surprise': 0, 'current_tick': 0, 'attention-spot': {'x': -1, 'y': -1}}
+
+    def arm_size(self) -> tuple:
+        return (self.agent_hand.left,
+                self.agent_hand.top,
+                self.agent_hand.right - self.agent_hand.left,
+                self.agent_hand.top - self.agent_hand.bottom)
+
+    def get_approx_for_circle(self, world_body):
+        return self.image_processor.get_approx_for_circle(world_body)
+
+    def get_approx_for_poly(self, data, angle=0, pos=(0, 0), in_radians=False):
+        return self.image_processor.get_approx_for_poly(data, angle, pos, in_radians)
+
+    def step(self) -> dict:
+        """
+        Perceives the world, lets the agent act on it and advances the physics by one time step
+        :return: the agent message of the step
+        """
+        for body in self.world.bodies:
+            if body.userData:
+                body.awake = True
+
+        self.image_processor.set_arm(self.arm_size(), self.agent_hand.hand_contour)
+        self.cur_step = self.image_processor.run(self.last_step, self.last_data)
+        self.last_step = [obj['center'] for obj in self.cur_step]
+        self.last_data = self.cur_step
+        self.viewing_the_status()
+        self.agent_message = (self.recorder or self.agent).env_step(self.cur_step)
+        self.Keyboard()
+        self.num_step += 1
+
+        self.world.Step(1.0 / self.hz, self.velocity_iterations, self.position_iterations)
+        self.world.ClearForces()
+        return self.agent_message
+
+    def run(self, num_ticks: int) -> float:
+        """
+        Steps the environment :param num_ticks: times
+        :return: ticks per second
+        """
+        start = time.perf_counter()
+        for _ in range(num_ticks):
+            self.step()
+        seconds = time.perf_counter() - start
+        return num_ticks / seconds if seconds else 0.0
+
+    def close(self):
+        if self.recorder:
+            self.recorder.close()
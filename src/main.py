@@ -9,6 +9,18 @@ if 'dist' in os.environ:
     DISTANCE = int(os.environ['dist'])
 else:
     DISTANCE = 25
+# number of ticks a headless run makes, it runs forever if not set
+if 'ticks' in os.environ:
+    TICKS = int(os.environ['ticks'])
+else:
+    TICKS = None
+# file to record the packets of a headless run to
+RECORDING_FILENAME = os.environ.get('record')
+# runs physics, vision and the agent as overlapping stages, the agent's actions are applied this many ticks late
+if 'pipeline_lag' in os.environ:
+    PIPELINE_LAG = int(os.environ['pipeline_lag'])
+else:
+    PIPELINE_LAG = None
 
 
 def main(test_class):
@@ -23,6 +35,39 @@ def main(test_class):
     test.run()
 
 
+def run_headless(num_ticks: int = None, recording_filename: str = None, pipeline_lag: int = None):
+    """
+    Steps the headless environment as fast as possible and reports ticks per second
+    """
+    from headless_environment import HeadlessEnvironment
+    environment = HeadlessEnvironment(recording_filename=recording_filename)
+    try:
+        if pipeline_lag is not None:
+            run_pipelined(environment, num_ticks, pipeline_lag)
+        elif num_ticks is None:
+            while True:
+                environment.step()
+        else:
+            ticks_per_second = environment.run(num_ticks)
+            print(f'\n{num_ticks} ticks, {ticks_per_second:.1f} ticks/s')
+    finally:
+        environment.close()
+
+
+def run_pipelined(environment, num_ticks: int, lag_tolerance: int):
+    from environment_pipeline import EnvironmentPipeline
+    if num_ticks is None:
+        raise ValueError('A pipelined run needs the number of ticks')
+    report = EnvironmentPipeline(environment, lag_tolerance).run(num_ticks)
+    print(f'\n{num_ticks} ticks, {report["ticks_per_second"]:.1f} ticks/s, lag tolerance {lag_tolerance}')
+    for name, stage in report['stages'].items():
+        print(f'{name:8} {stage["ticks_per_second"]:9.1f} ticks/s busy, utilization {stage["utilization"]:.2f}, '
+              f'queue depth mean {stage["mean_queue_depth"]:.2f} max {stage["max_queue_depth"]}')
+
+
 if __name__ == "__main__":
-    from agi_proto_framework import AgiProtoFramework
-    main(AgiProtoFramework)
+    if SERVER:
+        run_headless(TICKS, RECORDING_FILENAME, PIPELINE_LAG)
+    else:
+        from agi_proto_framework import AgiProtoFramework
+        main(AgiProtoFramework)
@@ -2,7 +2,7 @@ from typing import List, Dict
 
 from neuro.dopamine_portion import DopaminePortion
 from neuro.hyper_params import HyperParameters
-from neuro.neural_area import NeuralArea
+from neuro.neural_area import DOPAMINE_LOOKBACK, NeuralArea
 from neuro.neural_pattern import NeuralPattern
 from neuro.patterns_connection import PatternsConnection
 
@@ -60,11 +60,14 @@ class DopamineAnticipatorArea(NeuralArea):
             zone,
     ):
         super().__init__(name=name, agent=agent, zone=zone)
-        self.history = {}
+        self.history = self._make_dopamine_history(self._release_history_entry)
         self.pattern_energies: List[PatternDopeEnergy] = []
         self.burst_history = []
         self.chains = []
 
+    def _release_history_entry(self, patterns: List[NeuralPattern]):
+        self.container.pattern_registry.release(*patterns)
+
     def _check_if_chained(self, pattern) -> bool:
         current_tick = self.agent.network.current_tick
         chain_list = [bh[1] for bh in self.burst_history[-NUM_ELEMENTS_IN_CHAIN + 1:]]
@@ -108,7 +111,8 @@ class DopamineAnticipatorArea(NeuralArea):
         if len(input_patterns) == 0:
             return
 
-        self.history[current_tick] = input_patterns
+        if self.history.put(current_tick, input_patterns):
+            self.container.pattern_registry.acquire(*input_patterns)
 
         dope_value = 0
         for pattern in input_patterns:
@@ -148,7 +152,7 @@ class DopamineAnticipatorArea(NeuralArea):
                 continue
         
             processed_input_patterns = []
-            start_tick = current_tick - 4 if self_induced else current_tick - 8
+            start_tick = current_tick - 4 if self_induced else current_tick - DOPAMINE_LOOKBACK
             for causing_tick in range(start_tick, current_tick - 2):
                 if causing_tick in self.history:
                     patterns = self.history[causing_tick]
@@ -34,13 +34,22 @@ class DopaminePredictorArea(NeuralArea):
 
     def update(self):
         current_tick = self.agent.network.current_tick
+        store = self.container.connection_weights
+        rows, deltas = [], []
         for tc in self.traced_connections:
             if tc.updated:
                 continue
             if current_tick > tc.control_tick:
                 difference = tc.accumulated_dope - tc.connection.dope_value
-                tc.connection.update_weight(difference * HyperParameters.learning_rate)
+                if store is not None:
+                    rows.append(tc.connection._id)
+                    deltas.append(difference * HyperParameters.learning_rate)
+                else:
+                    tc.connection.update_weight(difference * HyperParameters.learning_rate)
                 tc.updated = True
+        if rows:
+            store.update_weights(rows, deltas)
+            self.agent.logger.write_content(f'{len(rows)} traced connection weights updated')
 
     def on_connection_activated(self, connection: PatternsConnection):
         current_tick = self.agent.network.current_tick
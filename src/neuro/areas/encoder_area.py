@@ -1,16 +1,25 @@
-from typing import List, Union
+from typing import List, Union, Tuple
 
+from neuro.highway_connections import HighwayConnections
 from neuro.hyper_params import HyperParameters
+from neuro.inverted_pattern_index import InvertedPatternIndex
+from neuro.lsh_pattern_index import LshPatternIndex
 from neuro.neural_area import NeuralArea
 from neuro.neural_pattern import NeuralPattern
+from neuro.pattern_matrix import PatternMatrix
+from neuro.pattern_registry import PatternRegistry
 from neuro.patterns_connection import PatternsConnection
 from neuro.sdr_processor import SDRProcessor
+from neuro.tick_ring_buffer import TickRingBuffer
 
 
 class EncoderArea(NeuralArea):
     """
     Converts a low level perceptive pattern to a sparse pattern
     """
+    parallel_update = True
+    updates_on_input = True
+
     def __init__(
             self,
             name: str,
@@ -24,6 +33,10 @@ class EncoderArea(NeuralArea):
             convey_new_pattern=False,
             cached_output_num_ticks=0,
             accepts_dopamine_from=None,
+            recognition_mode='first',
+            recognition_index='inverted',
+            lsh_bands: int = 0,
+            lsh_rows: int = 0,
     ):
         super().__init__(name=name, agent=agent, zone=zone)
         self.output_space_size = output_space_size or HyperParameters.encoder_space_size
@@ -31,19 +44,33 @@ class EncoderArea(NeuralArea):
         self.min_inputs = min_inputs
         self.processor = SDRProcessor(self)
         self.patterns: List[NeuralPattern] = []
-        self.highway_connections = set()
-        self.connections = []
+        self.highway_connections = HighwayConnections()
+        self.connections = None
         self.pattern_connections = []
-        self.history = {}
+        self.lsh_bands = lsh_bands or HyperParameters.lsh_bands
+        self.lsh_rows = lsh_rows or HyperParameters.lsh_rows
+        self.source_patterns_index = self._make_recognition_index(recognition_index)
+        self.history = TickRingBuffer(HyperParameters.history_retention, on_evict=self._release_history_entry)
         self.surprise_level = surprise_level
         self.convey_new_pattern = convey_new_pattern
         self.recognition_threshold = recognition_threshold or HyperParameters.pattern_recognition_threshold
+        assert recognition_mode in ('first', 'best'), f'Unknown recognition mode: {recognition_mode}'
+        self.recognition_mode = recognition_mode
         self.cached_output_num_ticks = cached_output_num_ticks
         self._cached_output = None
         self._cached_output_start_tick = 0
         self._accepts_dopamine_from = accepts_dopamine_from
         self._accepts_dopamine_from_is_synchronized = False
 
+    def _make_recognition_index(self, kind: str):
+        if kind == 'inverted':
+            return InvertedPatternIndex()
+        elif kind == 'matrix':
+            return PatternMatrix()
+        elif kind == 'lsh':
+            return LshPatternIndex(bands=self.lsh_bands, rows=self.lsh_rows)
+        raise AttributeError(f'Unknown recognition index: {kind}')
+
     def _sync_accepts_dopamine_from(self):
         if self._accepts_dopamine_from and not self._accepts_dopamine_from_is_synchronized:
             for item in self._accepts_dopamine_from:
@@ -53,8 +80,30 @@ class EncoderArea(NeuralArea):
                     self._accepts_dopamine_from.append(self.container.get_area_by_name(item))
             self._accepts_dopamine_from_is_synchronized = True
 
+    def needs_update(self) -> bool:
+        # inputs are reset on every update, so a clean area has no inputs and only a cached output may change
+        return super().needs_update() or self.min_inputs <= 0 or \
+            self._cached_output_alive(self.container.network.current_tick)
+
+    def skip_update(self):
+        self._sync_accepts_dopamine_from()
+        self.output = None
+
+    def _cached_output_alive(self, current_tick: int) -> bool:
+        return self.cached_output_num_ticks > 0 and self._cached_output is not None and \
+            current_tick - self._cached_output_start_tick < self.cached_output_num_ticks
+
     def update(self):
+        combined_pattern = self.begin_update()
+        if combined_pattern is not None:
+            self.finish_update(combined_pattern, self.encode(combined_pattern))
 
+    def begin_update(self) -> Union[NeuralPattern, None]:
+        """
+        The first part of update() that touches shared state. Makes the combined input pattern
+        :return: the pattern to pass to encode() and finish_update(), None if the update is already complete
+        """
+        self.dirty = False
         self._sync_accepts_dopamine_from()
 
         current_tick = self.agent.network.current_tick
@@ -63,21 +112,42 @@ class EncoderArea(NeuralArea):
         alive_inputs = len([pattern for pattern in self.inputs if pattern])
         if alive_inputs < self.min_inputs:
             self.reset_inputs()
-            if self.cached_output_num_ticks > 0 and self._cached_output and \
-                    current_tick - self._cached_output_start_tick < self.cached_output_num_ticks:
+            if self._cached_output_alive(current_tick):
                 self.output = self._cached_output
-                self.history[current_tick] = self.output
-            return
+                if self.history.put(current_tick, self.output):
+                    self.container.pattern_registry.acquire(self.output)
+            return None
 
-        combined_pattern = SDRProcessor.make_combined_pattern(self.inputs, self.input_sizes)
+        combined_pattern = SDRProcessor.make_combined_pattern(self.inputs, self.input_sizes, self)
         if combined_pattern:
             if self.container.network.verbose:
                 print(f'Combined receptive pattern: {combined_pattern}')
-            self.process_input(combined_pattern)
-        else:
-            self.output = None
+            return combined_pattern
+
+        self._complete_update(current_tick)
+        return None
+
+    def encode(self, pattern: NeuralPattern) -> tuple:
+        """
+        Recognition and SDR sampling of :param pattern:. Reads and writes only the area's own state
+        (recognition index, SDR connections, the processor's generator), so areas may encode concurrently
+        :return: (recognized output pattern, None) or (None, raw output of the SDR processor)
+        """
+        recognized_output = self.recognize_output_pattern(pattern)
+        if recognized_output:
+            return recognized_output, None
+        return None, self.processor.sample(pattern)
+
+    def finish_update(self, pattern: NeuralPattern, encoding: tuple):
+        """
+        The last part of update(): creates and learns the output pattern, sends messages, records history
+        """
+        self.process_input(pattern, encoding)
+        self._complete_update(self.agent.network.current_tick)
 
-        self.history[current_tick] = self.output
+    def _complete_update(self, current_tick: int):
+        if self.history.put(current_tick, self.output):
+            self.container.pattern_registry.acquire(self.output)
         self._cached_output = self.output
         self._cached_output_start_tick = current_tick
         self.reset_inputs()
@@ -88,10 +158,17 @@ class EncoderArea(NeuralArea):
         self.inputs = [None for i in range(len(self.input_sizes))]
 
     def recognize_output_pattern(self, input_pattern: NeuralPattern):
-        for connection in self.pattern_connections:
-            similarity = connection.source.similarity(input_pattern)
-            if similarity >= self.recognition_threshold:
-                return connection.target
+        """
+        Finds a learned source pattern similar to :param input_pattern: and returns its sparse counterpart.
+        Depending on recognition_mode it's either the earliest learned match or the most similar one
+        """
+        connection = self.source_patterns_index.find(
+            input_pattern,
+            self.recognition_threshold,
+            best_match=self.recognition_mode == 'best'
+        )
+        if connection:
+            return connection.target
         return None
 
     def process_input0(self, pattern: NeuralPattern) -> None:
@@ -119,8 +196,8 @@ class EncoderArea(NeuralArea):
             if self.container.network.verbose:
                 print(f'[{self.name}]: Existing pattern has been recognized {output_pattern}')
 
-    def process_input(self, pattern: NeuralPattern) -> None:
-        output_pattern, is_new = self.recognize_process_input(pattern)
+    def process_input(self, pattern: NeuralPattern, encoding: tuple = None) -> None:
+        output_pattern, is_new = self.recognize_process_input(pattern, encoding)
         if is_new:
             output_pattern.source_patterns = list(self.inputs)
             if self.container.network.verbose:
@@ -140,12 +217,59 @@ class EncoderArea(NeuralArea):
             if self.container.network.verbose:
                 print(f'[{self.name}]: Existing pattern has been recognized {output_pattern}')
 
-    def recognize_process_input(self, pattern: NeuralPattern) -> NeuralPattern:
-        recognized_output = self.recognize_output_pattern(pattern)
+    def recognize_process_input(self, pattern: NeuralPattern, encoding: tuple = None) -> NeuralPattern:
+        recognized_output, raw_output = encoding or self.encode(pattern)
         if recognized_output:
             return recognized_output, False
 
-        output_pattern = self.processor.process_input(pattern)
+        output_pattern = self.processor.make_output_pattern(raw_output)
+        self._learn_pattern(pattern, output_pattern)
+        return output_pattern, True
+
+    def encode_batch(self, patterns: List[NeuralPattern]) -> List[Tuple[NeuralPattern, bool]]:
+        """
+        Batch counterpart of recognize_process_input for offline encoding of recorded patterns.
+        Identical inputs are encoded once, the SDRs of all the unrecognized inputs are generated in one vectorized pass,
+        and new patterns are created in the order of :param patterns:. Unlike a loop over recognize_process_input,
+        highway connections learned from the batch only take effect for subsequent calls
+        :return: (output pattern, is new) for every input pattern
+        """
+        best_match = self.recognition_mode == 'best'
+        distinct_inputs = {}
+        for i, pattern in enumerate(patterns):
+            distinct_inputs.setdefault(PatternRegistry.make_key(pattern.space_size, pattern.value), []).append(i)
+
+        results = [None] * len(patterns)
+        new_patterns = []
+        # inputs recognized as one of the new patterns of this batch, they get resolved after generation
+        batch_index = InvertedPatternIndex()
+        recognized_in_batch = []
+        for positions in distinct_inputs.values():
+            pattern = patterns[positions[0]]
+            recognized_output = self.recognize_output_pattern(pattern)
+            if recognized_output:
+                for i in positions:
+                    results[i] = (recognized_output, False)
+                continue
+            new_idx = batch_index.find(pattern, self.recognition_threshold, best_match)
+            if new_idx is not None:
+                recognized_in_batch.append((positions, new_idx))
+                continue
+            batch_index.add(pattern, len(new_patterns))
+            new_patterns.append((positions, pattern))
+
+        output_patterns = self.processor.process_batch([pattern for _, pattern in new_patterns])
+        for (positions, pattern), output_pattern in zip(new_patterns, output_patterns):
+            self._learn_pattern(pattern, output_pattern)
+            results[positions[0]] = (output_pattern, True)
+            for i in positions[1:]:
+                results[i] = (output_pattern, False)
+        for positions, new_idx in recognized_in_batch:
+            for i in positions:
+                results[i] = (output_patterns[new_idx], False)
+        return results
+
+    def _learn_pattern(self, pattern: NeuralPattern, output_pattern: NeuralPattern):
         output_pattern.data = pattern.data
         output_pattern.log(self)
 
@@ -157,8 +281,19 @@ class EncoderArea(NeuralArea):
             area=self
         )
         self.pattern_connections.append(connection)
+        self.source_patterns_index.add(pattern, connection)
 
-        return output_pattern, True
+    def _release_history_entry(self, pattern: NeuralPattern):
+        self.container.pattern_registry.release(pattern)
+
+    def report(self):
+        histogram = self.processor.attempts_histogram
+        if histogram:
+            print(f'{self}: sdr attempts per encode {dict(sorted(histogram.items()))}, '
+                  f'fallbacks {self.processor.num_fallbacks}')
+        combined_pattern_cache = self.container.combined_pattern_cache
+        if self.name in combined_pattern_cache.stats:
+            print(f'{self}: combined pattern cache hit rate {combined_pattern_cache.hit_rate(self.name):.2f}')
 
     def accepts_dopamine_from(self, area: NeuralArea):
         return area in self._accepts_dopamine_from
\ No newline at end of file
@@ -83,7 +83,8 @@ class HandMotionArea(ActionArea):
                 pattern = NeuralPattern(
                     space_size=self.output_space_size,
                     value_size=self.output_norm,
-                    source_area=self
+                    source_area=self,
+                    registry=self.container.pattern_registry,
                 )
                 pattern.generate_random()
                 pattern.data = data
@@ -97,6 +98,7 @@ class HandMotionArea(ActionArea):
                     space_size=self.output_space_size,
                     value_size=self.output_norm,
                     source_area=self,
+                    registry=self.container.pattern_registry,
                 )
                 pattern.generate_random()
                 pattern.data = data
@@ -52,6 +52,10 @@ class PrimitivesReceptiveArea(ReceptiveArea):
 
     def activate_on_body(self, data, name):
         neural_indices = self.encode(data)
-        pattern = NeuralPattern.find_or_create(space_size=NEURAL_SPACE_SIZE, value=neural_indices)
+        pattern = NeuralPattern.find_or_create(
+            space_size=NEURAL_SPACE_SIZE,
+            value=neural_indices,
+            registry=self.container.pattern_registry
+        )
         pattern.data = {self.name: name}
         self.output = pattern
@@ -1,4 +1,7 @@
+import collections
 import random
+
+import numpy as np
 from typing import List, Union, Dict
 
 import pattern as pattern
@@ -7,7 +10,7 @@ from neuro.areas.action_area import ActionArea
 from neuro.areas.dopamine_predictor_area import DopaminePredictorArea
 from neuro.dopamine_portion import DopaminePortion
 from neuro.hyper_params import HyperParameters
-from neuro.neural_area import NeuralArea
+from neuro.neural_area import DOPAMINE_LOOKBACK, NeuralArea
 from neuro.neural_pattern import NeuralPattern
 from neuro.patterns_connection import PatternsConnection
 
@@ -36,10 +39,13 @@ class ReflexArea(NeuralArea):
         self.dopamine_predictor: DopaminePredictorArea = dopamine_predictor
         self.pattern_start_tick = None
         self.connections: List[PatternsConnection] = []
+        # source pattern id -> connections and (source id, target id) -> connection
+        self._connections_by_source = collections.defaultdict(list)
+        self._connections_by_source_target = {}
         self.active_pattern = None
         self.active_reflex: NeuralPattern = None
         self.output_space_size = HyperParameters.encoder_space_size
-        self.history = {}
+        self.history = self._make_dopamine_history(self._release_history_entry)
         self.move_state = {}
         self.move_return = None
         self.move_id = 1
@@ -47,11 +53,16 @@ class ReflexArea(NeuralArea):
 
     def get_connection_from(self, input_patterns: List[NeuralPattern]):
         current_tick = self.agent.network.current_tick
-        candidates = []
-        for connection in self.connections:
-            for pattern in input_patterns:
-                if connection.source == pattern and current_tick - connection.tick > 30:
-                    candidates.append((connection, connection.weight))
+        matches = []
+        for pattern in input_patterns:
+            if pattern:
+                matches.extend(self._connections_by_source.get(pattern._id, ()))
+        # the same order as scanning all the connections: by connection, then by input pattern
+        matches.sort(key=lambda c: c._id)
+        if self.container.connection_weights is not None:
+            return self._select_top_connection(matches, current_tick)
+        candidates = [(connection, connection.weight) for connection in matches
+                      if current_tick - connection.tick > 30]
         if len(candidates) == 0:
             return None
 
@@ -68,11 +79,29 @@ class ReflexArea(NeuralArea):
             top_connection = top_connections[0]
         return top_connection[0]
 
+    def _select_top_connection(self, matches: List[PatternsConnection], current_tick: int):
+        """
+        get_connection_from over the columnar weight store: the age filter and the top weight are vectorized
+        """
+        store = self.container.connection_weights
+        rows = np.fromiter((c._id for c in matches), dtype=np.int64, count=len(matches))
+        mature = np.flatnonzero(current_tick - store.ticks[rows] > 30)
+        if len(mature) == 0:
+            return None
+        top_positions = mature[store.top_rows(rows[mature])]
+        if store.weights[rows[top_positions[0]]] < 0.15:
+            return None
+        if len(top_positions) > 1:
+            return matches[random.choice(top_positions.tolist())]
+        return matches[top_positions[0]]
+
     def get_connection_from_to(self, source: NeuralPattern, target: NeuralPattern) -> PatternsConnection:
-        for connection in self.connections:
-            if connection.source == source and connection.target == target:
-                return connection
-        return None
+        return self._connections_by_source_target.get((source._id, target._id))
+
+    def _add_connection(self, connection: PatternsConnection):
+        self.connections.append(connection)
+        self._connections_by_source[connection.source._id].append(connection)
+        self._connections_by_source_target[(connection.source._id, connection.target._id)] = connection
 
     def find_pattern(self, input_pattern: NeuralPattern):
         for p in self.input_patterns:
@@ -179,13 +208,18 @@ class ReflexArea(NeuralArea):
                 self.active_pattern = random.choice(patterns)
             output = self.active_pattern
 
-        self.history[current_tick] = (self.inputs, output)
+        # the inputs list is shared with the connections feeding the area, so only the output is pinned
+        if self.history.put(current_tick, (self.inputs, output)):
+            self.container.pattern_registry.acquire(output)
         # output.log(self)
         self.output = output
 
         if self.agent.striatum_energy < 0:
             self.output = None
 
+    def _release_history_entry(self, combination: tuple):
+        self.container.pattern_registry.release(combination[1])
+
     def _process_input_output_combination(
             self,
             combination_tick: int,
@@ -201,6 +235,8 @@ class ReflexArea(NeuralArea):
 
         dope_value = sum(portion.value for portion in dopamine_portions)
 
+        store = self.container.connection_weights
+        updated_rows, assigned_rows = [], []
         for input_pattern in alive_patterns:
             connection = self.get_connection_from_to(source=input_pattern, target=combination[1])
             if not connection:
@@ -213,16 +249,27 @@ class ReflexArea(NeuralArea):
                     dope_value=dope_value,
                     area=self
                 )
-                self.connections.append(connection)
+                self._add_connection(connection)
                 processed_connections.add(connection)
                 self.agent.logger.write_content(f'connection created {connection}, weight={connection.weight}')
             else:
                 if connection not in processed_connections:
                     processed_connections.add(connection)
-                    connection.update_weight(dope_value * HyperParameters.learning_rate)
+                    if store is not None:
+                        updated_rows.append(connection._id)
+                    else:
+                        connection.update_weight(dope_value * HyperParameters.learning_rate)
+                elif store is not None:
+                    assigned_rows.append(connection._id)
                 else:
                     connection.weight = weight
 
+        if updated_rows:
+            store.update_weights(updated_rows, [dope_value * HyperParameters.learning_rate] * len(updated_rows))
+            self.agent.logger.write_content(f'{len(updated_rows)} connection weights updated by {dope_value}')
+        if assigned_rows:
+            store.set_weights(assigned_rows, weight)
+
     def accepts_dopamine(self, portion: DopaminePortion) -> bool:
         return False
 
@@ -234,7 +281,7 @@ class ReflexArea(NeuralArea):
             return
 
         processed_connections = set()
-        start_tick = current_tick - 4 if self_induced else current_tick - 8
+        start_tick = current_tick - 4 if self_induced else current_tick - DOPAMINE_LOOKBACK
         for causing_combination_tick in range(start_tick, current_tick - 2):
             if causing_combination_tick in self.history:
                 weight = 0.1 * (causing_combination_tick - start_tick + 1) + 0.2
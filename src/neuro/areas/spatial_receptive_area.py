@@ -73,7 +73,8 @@ class SpatialReceptiveArea(ReceptiveArea):
             pattern = NeuralPattern.find_or_create(
                 space_size=self.output_space_size,
                 value=neural_indices,
-                data={self.name: data})
+                data={self.name: data},
+                registry=self.container.pattern_registry)
         else:
             pattern = None
         self.output = pattern
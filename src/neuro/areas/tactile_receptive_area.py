@@ -17,7 +17,11 @@ class TactileReceptiveArea(ReceptiveArea):
         self._generate_patterns()
 
     def _make_random_pattern(self, data: dict):
-        pattern = NeuralPattern(space_size=self.single_space_size, value_size=self.output_norm // 2)
+        pattern = NeuralPattern(
+            space_size=self.single_space_size,
+            value_size=self.output_norm // 2,
+            registry=self.container.pattern_registry
+        )
         pattern.generate_random()
         pattern.data = data
         return pattern
@@ -32,4 +36,4 @@ class TactileReceptiveArea(ReceptiveArea):
         pattern_clenched = self.patterns_clenched[data['is_clenched']]
         pattern_holding = self.patterns_holding[data['is_holding']]
         self.output = SDRProcessor.make_combined_pattern(
-            [pattern_clenched, pattern_holding], [self.single_space_size] * 2)
+            [pattern_clenched, pattern_holding], [self.single_space_size] * 2, self)
@@ -0,0 +1,57 @@
+import collections
+import weakref
+
+from neuro.hyper_params import HyperParameters
+
+
+class CombinedPatternCache:
+    """
+    Bounded LRU cache of combined patterns keyed by the identities of the input patterns and the slot sizes
+    Input patterns are expected to keep their value once they take part in a combination
+    Combined patterns are held weakly, so the cache doesn't keep alive the patterns the registry evicts
+    """
+    def __init__(self, capacity: int = None):
+        self.capacity = capacity if capacity is not None else HyperParameters.combined_pattern_cache_size
+        # key -> weak reference to the combined pattern
+        self._entries = collections.OrderedDict()
+        # caller -> [hits, misses]
+        self.stats = collections.defaultdict(lambda: [0, 0])
+        # entries found dead on lookup, their patterns were collected after the registry evicted them
+        self.num_reclaimed = 0
+
+    @staticmethod
+    def make_key(inputs, input_sizes) -> tuple:
+        return tuple(pattern._id if pattern else None for pattern in inputs), tuple(input_sizes)
+
+    def get(self, key, caller=None):
+        reference = self._entries.get(key)
+        pattern = reference() if reference is not None else None
+        if pattern is None:
+            if reference is not None:
+                del self._entries[key]
+                self.num_reclaimed += 1
+            self.stats[caller][1] += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats[caller][0] += 1
+        return pattern
+
+    def put(self, key, pattern) -> None:
+        self._entries[key] = weakref.ref(pattern)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    def hit_rate(self, caller=None) -> float:
+        hits, misses = self.stats.get(caller, (0, 0))
+        lookups = hits + misses
+        return hits / lookups if lookups else 0.0
+
+    def hit_rates(self) -> dict:
+        return {caller: self.hit_rate(caller) for caller in self.stats}
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
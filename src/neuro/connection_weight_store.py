@@ -0,0 +1,64 @@
+import numpy as np
+
+MIN_WEIGHT = 0.1
+MAX_WEIGHT = 1.0
+
+
+class ConnectionWeightStore:
+    """
+    Struct-of-arrays storage of pattern connection weights, dope values and creation ticks
+    Rows are indexed by connection id, so weights of many connections are read and updated in bulk
+    """
+    def __init__(self, capacity: int = 1024):
+        self.weights = np.zeros(capacity, dtype=np.float32)
+        self.dope_values = np.zeros(capacity, dtype=np.float32)
+        # float32 would lose tick precision on long runs
+        self.ticks = np.zeros(capacity, dtype=np.int64)
+        self.size = 0
+
+    def _reserve(self, size: int):
+        capacity = len(self.weights)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        for name in ('weights', 'dope_values', 'ticks'):
+            column = getattr(self, name)
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:len(column)] = column
+            setattr(self, name, grown)
+
+    def add(self, row: int, weight: float, dope_value: float, tick: int):
+        self._reserve(row + 1)
+        self.weights[row] = weight
+        self.dope_values[row] = dope_value
+        self.ticks[row] = tick
+        self.size = max(self.size, row + 1)
+
+    def update_weights(self, rows, deltas):
+        """
+        Adds :param deltas: to the weights of :param rows: and clamps them to [MIN_WEIGHT, MAX_WEIGHT]
+        A row met several times is updated once per occurrence, in order, as sequential updates would do
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        deltas = np.asarray(deltas, dtype=self.weights.dtype)
+        while len(rows):
+            unique_rows, first_positions = np.unique(rows, return_index=True)
+            self.weights[unique_rows] = np.clip(
+                self.weights[unique_rows] + deltas[first_positions], MIN_WEIGHT, MAX_WEIGHT)
+            rest = np.ones(len(rows), dtype=bool)
+            rest[first_positions] = False
+            rows, deltas = rows[rest], deltas[rest]
+
+    def set_weights(self, rows, weights):
+        self.weights[np.asarray(rows, dtype=np.int64)] = weights
+
+    def top_rows(self, rows) -> np.ndarray:
+        """
+        Positions in :param rows: holding the maximum weight, in the order of :param rows:
+        """
+        weights = self.weights[rows]
+        return np.flatnonzero(weights == weights[np.argmax(weights)])
+
+    def __len__(self):
+        return self.size
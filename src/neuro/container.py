@@ -1,15 +1,22 @@
+import collections
 from typing import List
 
+from neuro.combined_pattern_cache import CombinedPatternCache
+from neuro.connection_weight_store import ConnectionWeightStore
+from neuro.hyper_params import HyperParameters
 from neuro.inter_area_connection import InterAreaConnection
 from neuro.neural_area import NeuralArea
 from neuro.neural_pattern import NeuralPattern
 from neuro.neural_zone import NeuralZone
+from neuro.pattern_registry import PatternRegistry
 from neuro.patterns_connection import PatternsConnection
 
 
 class Container:
     """
     Contains neural zones, areas and connections between areas i.e. connectome
+    Also owns the agent's pattern namespace: the pattern registry and the id counters,
+    so several agents can live in one process without sharing patterns
     """
     def __init__(self):
         self.network = None
@@ -17,15 +24,36 @@ class Container:
         self.connections = []
         self.zones = []
         self.pattern_connections = []
+        # bumped on every change of the connectome, so compiled step schedules know when to rebuild
+        self.version = 0
+        # (source area, target area) -> connection and source area -> outgoing connections
+        self._connections_index = {}
+        self._outgoing_connections = collections.defaultdict(list)
+        # (source pattern id, target pattern id) -> connection, pattern id -> connections from/to the pattern
+        self._pattern_connections_index = {}
+        self._pattern_connections_from = collections.defaultdict(list)
+        self._pattern_connections_to = collections.defaultdict(list)
+        self.pattern_registry = PatternRegistry()
+        self.combined_pattern_cache = CombinedPatternCache()
+        self._next_patterns_connection_id = 0
+        self.connection_weights = ConnectionWeightStore() if HyperParameters.columnar_connection_weights else None
 
     def add_area(self, area):
         self.areas.append(area)
+        self.on_connectome_changed()
 
     def add_zone(self, zone: NeuralZone):
         self.zones.append(zone)
+        self.on_connectome_changed()
+
+    def on_connectome_changed(self):
+        self.version += 1
 
     def get_outgoing_connections(self, area: NeuralArea) -> List[InterAreaConnection]:
-        return [c for c in self.connections if c.source == area]
+        return list(self._outgoing_connections.get(area, ()))
+
+    def get_connection(self, source: NeuralArea, target: NeuralArea) -> InterAreaConnection:
+        return self._connections_index.get((source, target))
 
     def add_connection(
             self,
@@ -33,18 +61,38 @@ class Container:
             target: NeuralPattern,
             source_output_property: str = None
     ) -> InterAreaConnection:
-        connections = [c for c in self.connections if c.source == source and c.target == target]
-        assert len(connections) == 0, f'Connection between {source} and {target} already exists'
+        assert (source, target) not in self._connections_index, \
+            f'Connection between {source} and {target} already exists'
         conn = InterAreaConnection(source=source, target=target, source_output_property=source_output_property)
         self.connections.append(conn)
+        self._connections_index[(source, target)] = conn
+        self._outgoing_connections[source].append(conn)
+        self.on_connectome_changed()
         conn.on_adding()
         return conn
 
+    def next_patterns_connection_id(self) -> int:
+        connection_id = self._next_patterns_connection_id
+        self._next_patterns_connection_id += 1
+        return connection_id
+
     def add_patterns_connection(self, connection: PatternsConnection) -> None:
-        connections = [c for c in self.pattern_connections if
-                       c.source == connection.source and c.target == connection.target]
-        assert len(connections) == 0, f'Connection between {connection.source} and {connection.target} already exists'
+        key = (connection.source._id, connection.target._id)
+        assert key not in self._pattern_connections_index, \
+            f'Connection between {connection.source} and {connection.target} already exists'
         self.pattern_connections.append(connection)
+        self._pattern_connections_index[key] = connection
+        self._pattern_connections_from[connection.source._id].append(connection)
+        self._pattern_connections_to[connection.target._id].append(connection)
+
+    def get_patterns_connection(self, source: NeuralPattern, target: NeuralPattern) -> PatternsConnection:
+        return self._pattern_connections_index.get((source._id, target._id))
+
+    def connections_from(self, pattern: NeuralPattern) -> List[PatternsConnection]:
+        return list(self._pattern_connections_from.get(pattern._id, ()))
+
+    def connections_to(self, pattern: NeuralPattern) -> List[PatternsConnection]:
+        return list(self._pattern_connections_to.get(pattern._id, ()))
 
     def get_area_by_name(self, name: str):
         selected = [area for area in self.areas if area.name == name]
@@ -0,0 +1,51 @@
+import numpy as np
+
+EMPTY_TARGETS = np.zeros(0, dtype=np.int64)
+
+
+class HighwayConnections:
+    """
+    Reinforced input-to-output cell connections of an encoder area, which always fire
+    Stored as adjacency lists keyed by the source cell, so the connections of a cell are looked up in O(out-degree)
+    """
+    def __init__(self):
+        self._targets = {}
+        self._arrays = {}
+        self.num_edges = 0
+
+    def add(self, source: int, target: int) -> None:
+        targets = self._targets.get(source)
+        if targets is None:
+            targets = self._targets[source] = set()
+        if target not in targets:
+            targets.add(target)
+            self._arrays.pop(source, None)
+            self.num_edges += 1
+
+    def add_many(self, sources, targets) -> None:
+        for source, target in zip(sources, targets):
+            self.add(source, target)
+
+    def targets_from(self, source: int) -> np.ndarray:
+        array = self._arrays.get(source)
+        if array is None:
+            targets = self._targets.get(source)
+            if not targets:
+                return EMPTY_TARGETS
+            array = self._arrays[source] = np.fromiter(targets, dtype=np.int64, count=len(targets))
+        return array
+
+    def out_degree(self, source: int) -> int:
+        return len(self._targets.get(source, ()))
+
+    def __contains__(self, connection) -> bool:
+        source, target = connection
+        return target in self._targets.get(source, ())
+
+    def __iter__(self):
+        for source, targets in self._targets.items():
+            for target in targets:
+                yield source, target
+
+    def __len__(self):
+        return self.num_edges
@@ -1,14 +1,52 @@
+import contextlib
+
 
 class HyperParameters:
 
     default_neuron_threshold = 2
     pattern_recognition_threshold = 0.8
+    lsh_bands = 20
+    lsh_rows = 4
     encoder_space_size = 1000
     space_encoder_space_size = 100
     space_encoder_norm = 20
     encoder_norm = 20
+    sdr_max_attempts = 8
+    sdr_activation_growth = 1.5
+    combined_pattern_cache_size = 4096
+    pattern_store_capacity = 100000
+    pattern_store_eviction_policy = 'lru'
+    pattern_store_low_watermark = 0.75
+    # ticks kept by area histories and the dopamine flow, must exceed the dopamine lookback of 8 ticks
+    history_retention = 16
+    # keep connection weights in NumPy columns and update them in bulk
+    columnar_connection_weights = False
+    # update only the areas that received input or run timers
+    event_driven_updates = False
+    # encode the independent areas of a dependency level on a thread pool
+    parallel_area_updates = False
+    parallel_workers = 4
+    pattern_history_retention = 4
     network_steps_per_env_step = 2
     learning_rate = 0.05
     striatum_energy_for_step = 0.2
     max_striatum_energy = 2.0
     min_striatum_energy = -20
+
+    @classmethod
+    @contextlib.contextmanager
+    def override(cls, **values):
+        """
+        Sets hyperparameters for the duration of the block and restores the previous values on exit
+        """
+        for name in values:
+            if name.startswith('_') or not hasattr(cls, name) or callable(getattr(cls, name)):
+                raise AttributeError(f'Unknown hyperparameter: {name}')
+        previous = {name: getattr(cls, name) for name in values}
+        try:
+            for name, value in values.items():
+                setattr(cls, name, value)
+            yield cls
+        finally:
+            for name, value in previous.items():
+                setattr(cls, name, value)
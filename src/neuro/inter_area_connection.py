@@ -8,10 +8,20 @@ class InterAreaConnection:
     def __init__(self, source: NeuralArea, target: NeuralArea, source_output_property: str = None):
         self.source = source
         self.target = target
-        self.is_open = True
+        self._is_open = True
         self.target_slot_index = None
         self.source_output_property = source_output_property
 
+    @property
+    def is_open(self) -> bool:
+        return self._is_open
+
+    @is_open.setter
+    def is_open(self, value: bool):
+        if value != self._is_open:
+            self._is_open = value
+            self.target.container.on_connectome_changed()
+
     def update(self):
         if not self.is_open:
             return
@@ -23,6 +33,8 @@ class InterAreaConnection:
 
         if output or self.target.receive_empty_input:
             self.target.inputs[self.target_slot_index] = output
+            if output:
+                self.target.mark_dirty()
 
     def on_adding(self):
         self.target_slot_index = len(self.target.inputs)
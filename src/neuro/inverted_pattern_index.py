@@ -0,0 +1,103 @@
+import math
+
+import numpy as np
+
+from neuro.neural_pattern import NeuralPattern
+
+INITIAL_POSTINGS_CAPACITY = 8
+
+
+def min_overlap(threshold: float, value_size: int) -> int:
+    """
+    The smallest overlap k such that k / value_size >= threshold, i.e. ceil(threshold * value_size)
+    computed without floating point surprises (0.9 * 20 = 18.000000000000004)
+    """
+    k = max(0, math.ceil(threshold * value_size))
+    while k > 0 and (k - 1) / value_size >= threshold:
+        k -= 1
+    while k / value_size < threshold:
+        k += 1
+    return k
+
+
+class InvertedPatternIndex:
+    """
+    Maps every active index to the stored patterns containing it, so that recognition only
+    touches the patterns which share active indices with the input
+    Each stored pattern is associated with an arbitrary item, e.g. a PatternsConnection
+    """
+    def __init__(self):
+        self.items = []
+        # postings of an index are rows of the patterns containing it, stored in a growable array
+        self._postings = {}
+        self._posting_lengths = {}
+        self._space_sizes = []
+        self._value_sizes = []
+
+    def __len__(self):
+        return len(self.items)
+
+    def add(self, pattern: NeuralPattern, item) -> None:
+        row = len(self.items)
+        for idx in set(pattern.value):
+            postings = self._postings.get(idx)
+            length = self._posting_lengths.get(idx, 0)
+            if postings is None or length == len(postings):
+                grown = np.zeros(max(INITIAL_POSTINGS_CAPACITY, 2 * length), dtype=np.int64)
+                if postings is not None:
+                    grown[:length] = postings
+                postings = self._postings[idx] = grown
+            postings[length] = row
+            self._posting_lengths[idx] = length + 1
+        self._space_sizes.append(pattern.space_size)
+        self._value_sizes.append(pattern.value_size)
+        self.items.append(item)
+
+    def overlaps(self, pattern: NeuralPattern):
+        """
+        Returns the rows sharing at least one active index with :param pattern: (sorted) and their overlaps
+        """
+        postings = [self.postings(idx) for idx in set(pattern.value) if idx in self._postings]
+        if len(postings) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        return np.unique(np.concatenate(postings), return_counts=True)
+
+    def postings(self, idx: int) -> np.ndarray:
+        """
+        Rows of the stored patterns containing the active index :param idx:
+        """
+        if idx not in self._postings:
+            return np.zeros(0, dtype=np.int64)
+        return self._postings[idx][:self._posting_lengths[idx]]
+
+    def find(self, pattern: NeuralPattern, threshold: float, best_match: bool = False):
+        """
+        Returns the item of the first (or the most similar if :param best_match:) stored pattern
+        whose similarity to :param pattern: is at least :param threshold:
+        """
+        if len(self.items) == 0 or pattern.value_size == 0:
+            return None
+        required_overlap = min_overlap(threshold, pattern.value_size)
+        if required_overlap == 0:
+            # every comparable stored pattern matches, including the ones without common indices
+            comparable_rows = [row for row in range(len(self.items)) if self._comparable(row, pattern)]
+            if len(comparable_rows) == 0:
+                return None
+            if not best_match:
+                return self.items[comparable_rows[0]]
+            rows, overlaps = self.overlaps(pattern)
+            overlap_of = dict(zip(rows.tolist(), overlaps.tolist()))
+            return self.items[max(comparable_rows, key=lambda row: (overlap_of.get(row, 0), -row))]
+
+        rows, overlaps = self.overlaps(pattern)
+        # count based rejection: only the rows with enough common indices are looked at
+        selected = overlaps >= required_overlap
+        rows, overlaps = rows[selected], overlaps[selected]
+        for i in (np.argsort(-overlaps, kind='stable') if best_match else range(len(rows))):
+            row = int(rows[i])
+            if self._comparable(row, pattern):
+                return self.items[row]
+        return None
+
+    def _comparable(self, row: int, pattern: NeuralPattern) -> bool:
+        return self._value_sizes[row] == pattern.value_size and self._space_sizes[row] == pattern.space_size
@@ -0,0 +1,90 @@
+import numpy as np
+
+from neuro.neural_pattern import NeuralPattern
+
+MERSENNE_PRIME = (1 << 31) - 1
+
+
+class LshPatternIndex:
+    """
+    Approximate recognition index. Patterns are MinHash-signed, signatures are split into bands,
+    and only the patterns sharing at least one band bucket with the input are scored exactly.
+    A pair of patterns with Jaccard similarity J becomes a candidate with probability 1 - (1 - J^rows)^bands
+    Each stored pattern is associated with an arbitrary item, e.g. a PatternsConnection
+    """
+    def __init__(self, bands: int, rows: int, seed: int = 0):
+        self.bands = bands
+        self.rows = rows
+        self.items = []
+        self._patterns = []
+        self._buckets = [{} for _ in range(bands)]
+        # own random state, so the index doesn't consume the global random stream
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, MERSENNE_PRIME, size=(bands * rows, 1), dtype=np.int64)
+        self._b = rng.randint(0, MERSENNE_PRIME, size=(bands * rows, 1), dtype=np.int64)
+        self._band_mix = rng.randint(1, MERSENNE_PRIME, size=rows, dtype=np.int64).astype(np.uint64)
+
+    def __len__(self):
+        return len(self.items)
+
+    def signature(self, pattern: NeuralPattern) -> np.ndarray:
+        value = np.asarray(pattern.value, dtype=np.int64)
+        return ((self._a * value + self._b) % MERSENNE_PRIME).min(axis=1)
+
+    def _band_keys(self, pattern: NeuralPattern) -> list:
+        """
+        Hashes every band of the signature into a single integer. Collisions only add candidates,
+        which are verified exactly anyway
+        """
+        signature = self.signature(pattern).astype(np.uint64).reshape(self.bands, self.rows)
+        keys = (signature * self._band_mix).sum(axis=1) + np.uint64(pattern.space_size)
+        return keys.tolist()
+
+    def add(self, pattern: NeuralPattern, item) -> None:
+        row = len(self.items)
+        if pattern.value:
+            # a bucket is a single row until it gets the second one, which saves a list per bucket
+            for buckets, key in zip(self._buckets, self._band_keys(pattern)):
+                bucket = buckets.get(key)
+                if bucket is None:
+                    buckets[key] = row
+                elif isinstance(bucket, list):
+                    bucket.append(row)
+                else:
+                    buckets[key] = [bucket, row]
+        self._patterns.append(pattern)
+        self.items.append(item)
+
+    def candidates(self, pattern: NeuralPattern) -> set:
+        rows = set()
+        if pattern.value:
+            for buckets, key in zip(self._buckets, self._band_keys(pattern)):
+                bucket = buckets.get(key)
+                if bucket is None:
+                    continue
+                if isinstance(bucket, list):
+                    rows.update(bucket)
+                else:
+                    rows.add(bucket)
+        return rows
+
+    def find(self, pattern: NeuralPattern, threshold: float, best_match: bool = False):
+        """
+        Returns the item of the first (or the most similar if :param best_match:) candidate pattern
+        whose similarity to :param pattern: is at least :param threshold:. Might miss a match
+        """
+        best_row, best_similarity = None, -1
+        for row in sorted(self.candidates(pattern)):
+            similarity = self._patterns[row].similarity(pattern)
+            if similarity < threshold:
+                continue
+            if not best_match:
+                return self.items[row]
+            if similarity > best_similarity:
+                best_row, best_similarity = row, similarity
+        if best_row is None:
+            return None
+        return self.items[best_row]
+
+    def bucket_sizes(self) -> list:
+        return [len(bucket) if isinstance(bucket, list) else 1 for band in self._buckets for bucket in band.values()]
@@ -1,5 +1,9 @@
 
+from concurrent.futures import ThreadPoolExecutor
+
 from neuro.container import Container
+from neuro.hyper_params import HyperParameters
+from neuro.step_schedule import StepSchedule
 
 
 class Network:
@@ -13,14 +17,67 @@ class Network:
         self.current_tick = 0
         self.verbose = False
         self.container.network = self
+        self.use_compiled_schedule = True
+        self.schedule: StepSchedule = None
+        self.event_driven = HyperParameters.event_driven_updates
+        self.parallel = HyperParameters.parallel_area_updates
+        self._executor: ThreadPoolExecutor = None
+        # areas updated and skipped by the event-driven loop on the last tick and in total
+        self.num_updated = 0
+        self.num_skipped = 0
+        self.total_updated = 0
+        self.total_skipped = 0
+
+    def compile_schedule(self) -> StepSchedule:
+        """
+        Builds the flat list of calls a step makes, it is rebuilt automatically once the connectome changes
+        """
+        self.schedule = StepSchedule(self.container)
+        return self.schedule
 
     def _step_impl(self):
+        if not self.use_compiled_schedule:
+            if self.parallel:
+                # the batches of independent areas come from the compiled schedule
+                raise ValueError('parallel_area_updates needs the compiled schedule')
+            self._step_generic()
+            return
+
+        if self.schedule is None or self.schedule.is_stale():
+            self.compile_schedule()
+        schedule = self.schedule
+
+        for hook in schedule.begin_hooks:
+            hook()
+
+        if self.parallel:
+            self._update_batches_parallel(schedule.batches)
+        elif self.event_driven:
+            self._update_dirty_areas(schedule.areas)
+        else:
+            for update in schedule.area_updates:
+                update()
+
+        for update in schedule.connection_updates:
+            update()
+
+        if self.current_tick in self.agent.dopamine_flow:
+            for zone in self.container.zones:
+                zone.spread_dope(self.agent.dopamine_flow[self.current_tick])
+
+        for hook in schedule.end_hooks:
+            hook()
+
+    def _step_generic(self):
 
         for zone in self.container.zones:
             zone.on_step_begin()
 
-        for area in self.container.areas:
-            area.update()
+        if self.event_driven:
+            self._update_dirty_areas(self.container.areas)
+        else:
+            for area in self.container.areas:
+                area.update()
 
         for connection in self.container.connections:
             connection.update()
@@ -32,6 +89,66 @@ class Network:
         for zone in self.container.zones:
             zone.on_step_end()
 
+    def _update_dirty_areas(self, areas):
+        num_updated = 0
+        for area in areas:
+            if area.needs_update():
+                area.update()
+                num_updated += 1
+            else:
+                area.skip_update()
+        self.num_updated = num_updated
+        self.num_skipped = len(areas) - num_updated
+        self.total_updated += self.num_updated
+        self.total_skipped += self.num_skipped
+
+    def _update_batches_parallel(self, batches):
+        """
+        Areas of a batch don't depend on each other, so their encode() calls run on a thread pool.
+        Everything touching shared state (patterns, agent messages, dopamine) runs on this thread
+        in the order of schedule.areas, so a parallel step gives the same outputs as a serial one
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=HyperParameters.parallel_workers)
+        num_updated = num_skipped = 0
+        for batch in batches:
+            began, jobs = set(), {}
+            for area in batch:
+                if area.parallel_update and (not self.event_driven or area.needs_update()):
+                    began.add(area)
+                    pattern = area.begin_update()
+                    if pattern is not None:
+                        jobs[area] = pattern
+            if len(jobs) > 1:
+                encodings = dict(zip(jobs, self._executor.map(lambda job: job[0].encode(job[1]), jobs.items())))
+            else:
+                encodings = {area: area.encode(pattern) for area, pattern in jobs.items()}
+
+            for area in batch:
+                if area.parallel_update:
+                    if area not in began:
+                        area.skip_update()
+                        num_skipped += 1
+                        continue
+                    if area in jobs:
+                        area.finish_update(jobs[area], encodings[area])
+                elif self.event_driven and not area.needs_update():
+                    area.skip_update()
+                    num_skipped += 1
+                    continue
+                else:
+                    area.update()
+                num_updated += 1
+        self.num_updated = num_updated
+        self.num_skipped = num_skipped
+        self.total_updated += num_updated
+        self.total_skipped += num_skipped
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
     def reset(self):
         for area in self.container.areas:
             for i in range(len(area.inputs)):
@@ -65,5 +182,8 @@ class Network:
 
     def report(self):
         print(f'Tick: {self.current_tick}')
+        print(f'Patterns: {self.container.pattern_registry.metrics()}')
+        if self.event_driven:
+            print(f'Areas: {self.num_updated} updated, {self.num_skipped} skipped')
         for area in self.container.areas:
             area.report()
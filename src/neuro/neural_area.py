@@ -1,13 +1,23 @@
 from typing import List
 
 from neuro.dopamine_portion import DopaminePortion
+from neuro.hyper_params import HyperParameters
 from neuro.neural_pattern import NeuralPattern
+from neuro.tick_ring_buffer import TickRingBuffer
+
+# number of ticks receive_dope() looks back for the patterns that caused the dopamine
+DOPAMINE_LOOKBACK = 8
 
 
 class NeuralArea:
     """
     Common data and methods for all neural areas
     """
+    # in the event-driven mode an area with this flag is only updated when it's dirty, see needs_update()
+    updates_on_input = False
+    # the area splits update() into begin_update(), a thread-safe encode() and finish_update()
+    parallel_update = False
+
     def __init__(self, name: str, agent, zone):
         self.agent = agent
         self.container = agent.container
@@ -19,6 +29,7 @@ class NeuralArea:
         self.zone = zone
         self.is_receptive = False
         self.receive_empty_input = False
+        self.dirty = False
 
     @classmethod
     def add(cls, name, agent, zone, **kwargs) -> 'NeuralArea':
@@ -33,9 +44,35 @@ class NeuralArea:
     def receive_dope(self, dopamine_portions: List[DopaminePortion], self_induced=False):
         pass
 
+    @staticmethod
+    def _make_dopamine_history(on_evict) -> TickRingBuffer:
+        """
+        History of an area that looks DOPAMINE_LOOKBACK ticks back in receive_dope()
+        The history also holds the current tick, so it must retain more than DOPAMINE_LOOKBACK ticks
+        """
+        if HyperParameters.history_retention <= DOPAMINE_LOOKBACK:
+            raise ValueError(f'history_retention must be greater than the dopamine lookback of {DOPAMINE_LOOKBACK} '
+                             f'ticks, got {HyperParameters.history_retention}')
+        return TickRingBuffer(HyperParameters.history_retention, on_evict=on_evict)
+
     def accepts_dopamine_from(self, area: 'NeuralArea'):
         raise NotImplementedError('accepts_dopamine_from() must be implemented')
 
+    def mark_dirty(self):
+        self.dirty = True
+
+    def needs_update(self) -> bool:
+        """
+        Whether the event-driven network loop has to call update() on this tick
+        """
+        return self.dirty or not self.updates_on_input
+
+    def skip_update(self):
+        """
+        Called instead of update() when the area doesn't need it, must leave the area as update() would
+        """
+        pass
+
     def update(self):
         self.zone.on_area_updated(self)
 
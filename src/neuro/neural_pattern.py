@@ -1,9 +1,12 @@
 import random
 
 from neuro.dopamine_portion import DopaminePortion
+from neuro.hyper_params import HyperParameters
+from neuro.pattern_registry import PatternRegistry
+from neuro.sdr_bits import make_value, pack_value, overlap, to_words
+from neuro.tick_ring_buffer import TickRingBuffer
 
-GLOBAL_COUNTER = 0
-all_patterns = []
+EMPTY_VALUE = ()
 
 
 class NeuralPattern:
@@ -11,7 +14,14 @@ class NeuralPattern:
     The basic unit of information for the neural system
     Patterns might represent body shapes, locations, velocity, distance, actions etc.
     Also patterns can merge making up a combined pattern
+    Patterns are numerous, so they keep no __dict__, store the value in a compact array
+    and allocate history and source patterns only when they are used
     """
+    __slots__ = (
+        '_value', 'value_size', 'data', '_source_patterns', 'source_area', 'space_size', '_history', '_bits', '_id',
+        'registry', '__weakref__',
+    )
+
     def __init__(
             self,
             space_size: int,
@@ -20,57 +30,116 @@ class NeuralPattern:
             data=None,
             source_area=None,
             generate_inplace=False,
+            *,
+            registry: PatternRegistry,
     ):
-        global GLOBAL_COUNTER, all_patterns
+        self.registry = registry
+        self.space_size = space_size
+        self._bits = None
         if value:
-            self.value = value
+            self._set_value(value)
             self.value_size = len(value)
         else:
-            self.value = []
+            self._set_value(EMPTY_VALUE)
             self.value_size = value_size
         self.data = data
-        self.source_patterns = []
+        self._source_patterns = None
         self.source_area = source_area
-        self.space_size = space_size
-        self.history = {}
-        self._id = GLOBAL_COUNTER
-        GLOBAL_COUNTER += 1
+        self._history = None
+        self._id = registry.next_id()
         if generate_inplace:
             self.generate_random()
-        all_patterns.append(self)
+        registry.add(self)
 
     @classmethod
-    def find_or_create(cls, space_size: int, value_size: int = 0, value=None, data=None, source_area=None):
-        global all_patterns
-
+    def find_or_create(
+            cls,
+            space_size: int,
+            value_size: int = 0,
+            value=None,
+            data=None,
+            source_area=None,
+            *,
+            registry: PatternRegistry,
+    ):
         if value:
-            for pattern in all_patterns:
-                if space_size != pattern.space_size or len(value) != pattern.value_size:
-                    continue
-                intersection = set(value) & set(pattern.value)
-                if len(intersection) == len(value):
-                    return pattern
-        return cls(space_size=space_size, value_size=value_size, value=value, data=data, source_area=source_area)
+            pattern = registry.find(space_size, value)
+            if pattern is not None:
+                return pattern
+        return cls(
+            space_size=space_size,
+            value_size=value_size,
+            value=value,
+            data=data,
+            source_area=source_area,
+            registry=registry,
+        )
+
+    @property
+    def value(self):
+        """
+        Active indices, read-only since the registry indexes patterns by their value
+        """
+        return self._value
+
+    def _set_value(self, value):
+        self._value = make_value(value, self.space_size) if value else EMPTY_VALUE
+        self._bits = None
+
+    @property
+    def history(self) -> TickRingBuffer:
+        if self._history is None:
+            self._history = TickRingBuffer(HyperParameters.pattern_history_retention)
+        return self._history
+
+    @property
+    def source_patterns(self):
+        return self._source_patterns if self._source_patterns is not None else EMPTY_VALUE
+
+    @source_patterns.setter
+    def source_patterns(self, patterns):
+        self._source_patterns = patterns or None
+
+    @property
+    def bits(self) -> int:
+        """
+        The value packed into a bit mask, bit i is set if index i is active
+        """
+        if self._bits is None:
+            self._bits = pack_value(self.value)
+        return self._bits
+
+    @property
+    def packed_bits(self):
+        """
+        The value packed into a uint64 array sized to space_size
+        """
+        return to_words(self.bits, self.space_size)
+
+    def overlap(self, other: 'NeuralPattern') -> int:
+        return overlap(self.bits, other.bits)
 
     def __eq__(self, other):
         if self.value_size != other.value_size or self.space_size != other.space_size:
             return False
-        intersection = set(self.value) & set(other.value)
-        return len(intersection) == self.value_size
+        return self.overlap(other) == self.value_size
 
     def similarity(self, other):
         if self.value_size != other.value_size or self.space_size != other.space_size:
             return 0
-        intersection = set(self.value) & set(other.value)
-        return len(intersection) / self.value_size
+        return self.overlap(other) / self.value_size
 
-    def generate_random(self):
-        self.value = random.sample(range(self.space_size), self.value_size)
-        self.value.sort()
+    def generate_random(self, rng: random.Random = None):
+        self._set_value(sorted((rng or random).sample(range(self.space_size), self.value_size)))
+        self.registry.index(self)
 
     def log(self, area: 'NeuralArea'):
-        current_tick = area.container.network.current_tick
-        self.history[current_tick] = [area]
+        """
+        Records the tick :param area: produced the pattern on. Nothing reads pattern histories by default,
+        so they are kept only once a reader has accessed `history`
+        """
+        if self._history is not None:
+            self._history[area.container.network.current_tick] = [area]
 
     def merge_histories(self, histories: list):
         return
@@ -0,0 +1,74 @@
+import numpy as np
+
+from neuro.neural_pattern import NeuralPattern
+from neuro.sdr_bits import num_words, popcount_rows
+
+INITIAL_CAPACITY = 64
+
+
+class PatternMatrix:
+    """
+    Stores patterns as rows of a packed bit matrix so that an input pattern can be scored
+    against all of them in a single vectorized operation
+    Each row is associated with an arbitrary item, e.g. a PatternsConnection
+    """
+    def __init__(self, capacity: int = INITIAL_CAPACITY):
+        self.items = []
+        self._words = np.zeros((capacity, 1), dtype=np.uint64)
+        self._space_sizes = np.zeros(capacity, dtype=np.int64)
+        self._value_sizes = np.zeros(capacity, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.items)
+
+    def _reserve(self, num_rows: int, words_per_row: int):
+        capacity, width = self._words.shape
+        if num_rows <= capacity and words_per_row <= width:
+            return
+        while capacity < num_rows:
+            capacity *= 2
+        width = max(width, words_per_row)
+        words = np.zeros((capacity, width), dtype=np.uint64)
+        words[:len(self.items), :self._words.shape[1]] = self._words[:len(self.items)]
+        self._words = words
+        self._space_sizes = np.resize(self._space_sizes, capacity)
+        self._value_sizes = np.resize(self._value_sizes, capacity)
+
+    def add(self, pattern: NeuralPattern, item) -> None:
+        row = len(self.items)
+        self._reserve(row + 1, num_words(pattern.space_size))
+        packed = pattern.packed_bits
+        self._words[row, :] = 0
+        self._words[row, :len(packed)] = packed
+        self._space_sizes[row] = pattern.space_size
+        self._value_sizes[row] = pattern.value_size
+        self.items.append(item)
+
+    def similarities(self, pattern: NeuralPattern) -> np.ndarray:
+        """
+        Vectorized NeuralPattern.similarity of every stored pattern against :param pattern:
+        """
+        num_rows = len(self.items)
+        if num_rows == 0:
+            return np.zeros(0)
+        packed = pattern.packed_bits
+        width = min(len(packed), self._words.shape[1])
+        overlaps = popcount_rows(self._words[:num_rows, :width] & packed[:width])
+        value_sizes = self._value_sizes[:num_rows]
+        comparable = (value_sizes == pattern.value_size) & (self._space_sizes[:num_rows] == pattern.space_size)
+        scores = np.zeros(num_rows)
+        np.divide(overlaps, value_sizes, out=scores, where=comparable)
+        return scores
+
+    def find(self, pattern: NeuralPattern, threshold: float, best_match: bool = False):
+        """
+        Returns the item of the first (or the most similar if :param best_match:) stored pattern
+        whose similarity to :param pattern: is at least :param threshold:
+        """
+        scores = self.similarities(pattern)
+        matches = np.flatnonzero(scores >= threshold)
+        if len(matches) == 0:
+            return None
+        if best_match:
+            return self.items[int(matches[np.argmax(scores[matches])])]
+        return self.items[int(matches[0])]
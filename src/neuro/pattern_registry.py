@@ -0,0 +1,170 @@
+import collections
+import weakref
+from array import array
+
+from neuro.hyper_params import HyperParameters
+from neuro.sdr_bits import value_typecode
+
+EVICTION_POLICIES = ('lru', 'usage')
+
+
+class PatternRegistry:
+    """
+    Bounded store of the patterns created so far, each agent container owns its own registry
+    The registry also hands out pattern ids, so ids are unique within an agent
+    Patterns are indexed by (space_size, sorted value) so an exact lookup doesn't scan the whole registry
+    Patterns referenced by connections or area histories are pinned, the rest are evicted by the policy
+    once the store grows over its capacity. An evicted pattern is only weakly held: it is still found
+    while something else keeps it alive, and it is reclaimed by the garbage collector otherwise
+    """
+    def __init__(self, capacity: int = None, eviction_policy: str = None):
+        self.capacity = capacity if capacity is not None else HyperParameters.pattern_store_capacity
+        self.eviction_policy = eviction_policy or HyperParameters.pattern_store_eviction_policy
+        if self.eviction_policy not in EVICTION_POLICIES:
+            raise ValueError(f'unknown eviction policy: {self.eviction_policy}')
+        # key -> pattern, ordered from the least to the most recently used
+        self._index = collections.OrderedDict()
+        self._evicted = weakref.WeakValueDictionary()
+        # pattern id -> number of lookups, used by the 'usage' policy
+        self._usage = collections.Counter()
+        # pattern id -> number of references held by connections and histories
+        self._references = collections.Counter()
+        self._next_id = 0
+        self.num_created = 0
+        self.num_evicted = 0
+        self.num_restored = 0
+        self.num_compactions = 0
+        self._compaction_size = self.capacity
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(space_size: int, value) -> tuple:
+        # packed bytes of the sorted indices are much smaller than a frozenset of ints
+        return space_size, array(value_typecode(space_size), sorted(value)).tobytes()
+
+    def next_id(self) -> int:
+        pattern_id = self._next_id
+        self._next_id += 1
+        return pattern_id
+
+    def add(self, pattern: 'NeuralPattern') -> None:
+        self.num_created += 1
+        self.index(pattern)
+
+    def index(self, pattern: 'NeuralPattern') -> None:
+        """
+        (Re)indexes a pattern by its current value. The earliest created pattern wins on collisions
+        """
+        if not pattern.value:
+            return
+        key = self.make_key(pattern.space_size, pattern.value)
+        if key in self._index:
+            return
+        earlier_pattern = self._evicted.pop(key, None)
+        if earlier_pattern is not None:
+            self.num_restored += 1
+            pattern = earlier_pattern
+        self._index[key] = pattern
+        if len(self._index) > self._compaction_size:
+            self.compact()
+
+    def find(self, space_size: int, value) -> 'NeuralPattern':
+        key = self.make_key(space_size, value)
+        pattern = self._index.get(key)
+        if pattern is None:
+            pattern = self._evicted.pop(key, None)
+            if pattern is not None:
+                self.num_restored += 1
+                self._index[key] = pattern
+        if pattern is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._index.move_to_end(key)
+        self._usage[pattern._id] += 1
+        return pattern
+
+    def acquire(self, *patterns) -> None:
+        """
+        Pins patterns, so they are never evicted until released
+        """
+        for pattern in patterns:
+            if pattern is not None:
+                self._references[pattern._id] += 1
+
+    def release(self, *patterns) -> None:
+        for pattern in patterns:
+            if pattern is not None:
+                self._references[pattern._id] -= 1
+                if self._references[pattern._id] <= 0:
+                    del self._references[pattern._id]
+
+    def is_referenced(self, pattern: 'NeuralPattern') -> bool:
+        return pattern._id in self._references
+
+    def compact(self) -> int:
+        """
+        Evicts unreferenced patterns until the store shrinks to its low watermark
+        :return: number of evicted patterns
+        """
+        target_size = int(self.capacity * HyperParameters.pattern_store_low_watermark)
+        num_to_evict = len(self._index) - target_size
+        if num_to_evict <= 0:
+            return 0
+        candidates = [key for key, pattern in self._index.items() if pattern._id not in self._references]
+        if self.eviction_policy == 'usage':
+            # stable sort keeps the least recently used first among equally used patterns
+            candidates.sort(key=lambda k: self._usage[self._index[k]._id])
+        evicted = candidates[:num_to_evict]
+        for key in evicted:
+            pattern = self._index.pop(key)
+            self._usage.pop(pattern._id, None)
+            self._evicted[key] = pattern
+        self.num_evicted += len(evicted)
+        self.num_compactions += 1
+        # when pinned patterns keep the store over capacity, let it grow before scanning it again
+        self._compaction_size = max(self.capacity, len(self._index) + self.capacity - target_size)
+        return len(evicted)
+
+    @property
+    def num_live(self) -> int:
+        """
+        Number of patterns the store keeps strongly
+        """
+        return len(self._index)
+
+    @property
+    def num_over_capacity(self) -> int:
+        """
+        Number of live patterns over the capacity, the store can't shrink below its pinned patterns
+        """
+        return max(0, self.num_live - self.capacity)
+
+    @property
+    def num_reclaimed(self) -> int:
+        """
+        Number of evicted patterns already collected because nothing else referenced them
+        """
+        return self.num_evicted - self.num_restored - len(self._evicted)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def metrics(self) -> dict:
+        return {
+            'created': self.num_created,
+            'live': self.num_live,
+            'over_capacity': self.num_over_capacity,
+            'pinned': len(self._references),
+            'evicted': self.num_evicted,
+            'restored': self.num_restored,
+            'reclaimed': self.num_reclaimed,
+            'compactions': self.num_compactions,
+            'hit_rate': self.hit_rate,
+        }
+
+    def __len__(self):
+        return len(self._index)
@@ -31,7 +31,7 @@ class PatternsCombiner(NeuralArea):
         for combination in combinations:
             if 3 > len(combination) > 1:
                 input_sizes = [p.space_size for p in combination]
-                pattern = SDRProcessor.make_combined_pattern(combination, input_sizes)
+                pattern = SDRProcessor.make_combined_pattern(combination, input_sizes, self)
             elif len(combination) == 1:
                 pattern = combination[0]
             else:
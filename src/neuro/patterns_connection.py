@@ -1,8 +1,8 @@
+import random
+
 from neuro.hyper_params import HyperParameters
 from neuro.neural_pattern import NeuralPattern
 
-GLOBAL_COUNTER = 0
-
 
 class PatternsConnection:
     """
@@ -20,22 +20,63 @@ class PatternsConnection:
                  ):
         self.source = source
         self.target = target
-        self.weight = weight
         self.agent = agent
-        self.tick = tick
         self.area = area
-        self.dope_value = dope_value
-        self.pattern = NeuralPattern(
-            space_size=HyperParameters.encoder_space_size,
-            value_size=HyperParameters.encoder_norm,
-            generate_inplace=True
-        )
-        self.pattern.source_area = area
-        self.pattern.source_patterns = [source, target]
-        self.pattern.data = self._merge_pattern_datas(source, target)
-        global GLOBAL_COUNTER
-        self._id = GLOBAL_COUNTER
-        GLOBAL_COUNTER += 1
+        self._id = agent.container.next_patterns_connection_id()
+        self._weights = agent.container.connection_weights
+        if self._weights is not None:
+            self._weights.add(self._id, weight, dope_value, tick)
+        else:
+            self._weight = weight
+            self._tick = tick
+            self._dope_value = dope_value
+        # the connection pattern is only needed once the connection fires, so it is generated on first access
+        # from a seed drawn now, which keeps runs reproducible under random.seed()
+        self._pattern = None
+        self._pattern_seed = random.getrandbits(64)
+        agent.container.pattern_registry.acquire(source, target)
+
+    @property
+    def pattern(self) -> NeuralPattern:
+        if self._pattern is None:
+            registry = self.agent.container.pattern_registry
+            pattern = NeuralPattern(
+                space_size=HyperParameters.encoder_space_size,
+                value_size=HyperParameters.encoder_norm,
+                source_area=self.area,
+                registry=registry,
+            )
+            pattern.generate_random(random.Random(self._pattern_seed))
+            pattern.source_patterns = [self.source, self.target]
+            pattern.data = self._merge_pattern_datas(self.source, self.target)
+            registry.acquire(pattern)
+            self._pattern = pattern
+        return self._pattern
+
+    @property
+    def weight(self) -> float:
+        if self._weights is not None:
+            return float(self._weights.weights[self._id])
+        return self._weight
+
+    @weight.setter
+    def weight(self, val: float):
+        if self._weights is not None:
+            self._weights.weights[self._id] = val
+        else:
+            self._weight = val
+
+    @property
+    def tick(self) -> int:
+        if self._weights is not None:
+            return int(self._weights.ticks[self._id])
+        return self._tick
+
+    @property
+    def dope_value(self):
+        if self._weights is not None:
+            return float(self._weights.dope_values[self._id])
+        return self._dope_value
 
     @staticmethod
     def _merge_pattern_datas(pattern1: NeuralPattern, pattern2: NeuralPattern):
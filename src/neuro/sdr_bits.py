@@ -0,0 +1,75 @@
+from array import array
+
+import numpy as np
+
+WORD_SIZE = 64
+
+
+def value_typecode(space_size: int) -> str:
+    """
+    The smallest array typecode able to hold every index of the space
+    """
+    return 'H' if space_size <= 1 << 16 else 'I'
+
+
+def make_value(value, space_size: int) -> array:
+    """
+    Stores active indices in a compact array instead of a list of int objects
+    """
+    typecode = value_typecode(space_size)
+    if isinstance(value, array) and value.typecode == typecode:
+        return value
+    return array(typecode, value)
+
+
+def pack_value(value) -> int:
+    """
+    Packs active indices of a sparse pattern into a bit mask
+    """
+    bits = 0
+    for idx in value:
+        bits |= 1 << idx
+    return bits
+
+
+if hasattr(int, 'bit_count'):
+    def popcount(bits: int) -> int:
+        return bits.bit_count()
+else:
+    def popcount(bits: int) -> int:
+        return bin(bits).count('1')
+
+
+def overlap(bits1: int, bits2: int) -> int:
+    """
+    Number of active indices two packed patterns have in common
+    """
+    return popcount(bits1 & bits2)
+
+
+def num_words(space_size: int) -> int:
+    return (space_size + WORD_SIZE - 1) // WORD_SIZE
+
+
+def to_words(bits: int, space_size: int) -> np.ndarray:
+    """
+    Converts a bit mask to a uint64 array of num_words(space_size) words, least significant word first
+    """
+    return np.frombuffer(bits.to_bytes(num_words(space_size) * 8, 'little'), dtype='<u8').astype(np.uint64)
+
+
+if hasattr(np, 'bitwise_count'):
+    def popcount_rows(words: np.ndarray) -> np.ndarray:
+        """
+        Number of set bits in every row of a 2-D uint64 array
+        """
+        return np.bitwise_count(words).sum(axis=1, dtype=np.int64)
+else:
+    _BYTE_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+    def popcount_rows(words: np.ndarray) -> np.ndarray:
+        """
+        Number of set bits in every row of a 2-D uint64 array
+        """
+        as_bytes = np.ascontiguousarray(words).view(np.uint8).reshape(words.shape[0], -1)
+        return _BYTE_POPCOUNT[as_bytes].sum(axis=1, dtype=np.int64)
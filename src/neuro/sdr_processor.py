@@ -2,8 +2,14 @@ import collections
 import random
 from typing import Union, List
 
+import numpy as np
+
 from neuro.hyper_params import HyperParameters
 from neuro.neural_pattern import NeuralPattern
+from neuro.sdr_bits import pack_value, overlap
+
+ACTIVATION_PROBABILITY = 0.1
+BATCH_CHUNK_SIZE = 256
 
 
 class SDRProcessor:
@@ -13,86 +19,265 @@ class SDRProcessor:
     """
     def __init__(self, area: 'EncoderArea'):
         self.area = area
+        # seeded from the global stream, so an agent stays reproducible under random.seed()
+        self.rng = np.random.default_rng(random.getrandbits(64))
+        # number of sampling attempts per encode, sdr_max_attempts + 1 stands for the deterministic fallback
+        self.attempts_histogram = collections.Counter()
+        self.num_fallbacks = 0
 
     def process_input(self, pattern: NeuralPattern) -> NeuralPattern:
-        output, connections = self._get_raw_output(pattern)
+        return self.make_output_pattern(self.sample(pattern))
+
+    def sample(self, pattern: NeuralPattern) -> tuple:
+        """
+        Samples the sparse output for :param pattern: without creating patterns or learning highways,
+        touches only the state of the processor and its area
+        :return: (output cell indices, (sources, targets) of the fired connections)
+        """
+        return self._get_raw_output(pattern)
+
+    def make_output_pattern(self, raw_output: tuple) -> NeuralPattern:
+        """
+        Finds or creates the output pattern of a sample() result and learns its highway connections
+        """
+        output, (sources, targets) = raw_output
         output_pattern = NeuralPattern.find_or_create(
             self.area.output_space_size,
             value=output,
-            source_area=self.area
+            source_area=self.area,
+            registry=self.area.container.pattern_registry
         )
-        self.area.highway_connections.update(connections)
+        self.area.highway_connections.add_many(sources.tolist(), targets.tolist())
         return output_pattern
 
+    def process_batch(self, patterns: List[NeuralPattern]) -> List[NeuralPattern]:
+        """
+        Batch counterpart of process_input. Activations of all the patterns are sampled in one vectorized pass,
+        so the highway connections learned from the batch only take effect for the subsequent calls.
+        Output patterns are created in the order of :param patterns:
+        """
+        if len(patterns) == 0:
+            return []
+        if self.area.connections is None:
+            self.area.connections = self._generate_connections(patterns[0])
+
+        raw_outputs = []
+        for start in range(0, len(patterns), BATCH_CHUNK_SIZE):
+            raw_outputs.extend(self._sample_batch(patterns[start:start + BATCH_CHUNK_SIZE]))
+
+        output_patterns = []
+        for output, (sources, targets) in raw_outputs:
+            output_pattern = NeuralPattern.find_or_create(
+                self.area.output_space_size,
+                value=output,
+                source_area=self.area,
+                registry=self.area.container.pattern_registry
+            )
+            self.area.highway_connections.add_many(sources.tolist(), targets.tolist())
+            output_patterns.append(output_pattern)
+        return output_patterns
+
+    def _sample_batch(self, patterns: List[NeuralPattern]):
+        """
+        The first sampling attempt for all the patterns at once, the patterns which fail it
+        go through the regular retries of _select_pattern
+        :return: a list of (output cell indices, (sources, targets) of the fired connections leading to them)
+        """
+        num_patterns = len(patterns)
+        space_size = self.area.output_space_size
+        connections = self.area.connections
+        values = [np.asarray(pattern.value, dtype=np.int64) for pattern in patterns]
+        active_cells = np.concatenate(values)
+        cell_owners = np.repeat(np.arange(num_patterns), [len(value) for value in values])
+
+        outgoing_connections = connections[active_cells]
+        fired = self.rng.random(outgoing_connections.shape) < ACTIVATION_PROBABILITY
+        num_fired = fired.sum(axis=1)
+        owners = [np.repeat(cell_owners, num_fired)]
+        sources = [np.repeat(active_cells, num_fired)]
+        targets = [outgoing_connections[fired]]
+        highway_connections = self.area.highway_connections
+        for i, pattern in enumerate(patterns):
+            for idx in pattern.value:
+                highway_activations = highway_connections.targets_from(idx)
+                if len(highway_activations):
+                    owners.append(np.full(len(highway_activations), i, dtype=np.int64))
+                    sources.append(np.full(len(highway_activations), idx, dtype=np.int64))
+                    targets.append(highway_activations)
+        owners = np.concatenate(owners)
+        sources = np.concatenate(sources)
+        targets = np.concatenate(targets)
+
+        potentials = np.bincount(owners * space_size + targets, minlength=num_patterns * space_size)
+        potentials = potentials.reshape(num_patterns, space_size)
+        winners = [self._select_winners(potentials[i]) for i in range(num_patterns)]
+
+        # keep the fired connections leading to the winners and group them by pattern
+        in_output = np.zeros((num_patterns, space_size), dtype=bool)
+        for i, out_pattern in enumerate(winners):
+            if out_pattern is not None:
+                in_output[i, out_pattern] = True
+        selected = np.flatnonzero(in_output[owners, targets])
+        selected = selected[np.argsort(owners[selected], kind='stable')]
+        bounds = np.searchsorted(owners[selected], np.arange(num_patterns + 1))
+
+        results = []
+        for i, out_pattern in enumerate(winners):
+            if out_pattern is None:
+                out_pattern, activated_connections = self._select_pattern(patterns[i], connections)
+            else:
+                self.attempts_histogram[1] += 1
+                rows = selected[bounds[i]:bounds[i + 1]]
+                activated_connections = (sources[rows], targets[rows])
+            results.append((self._trim_output(out_pattern), activated_connections))
+        return results
+
     def patterns_similar(self, pattern1: NeuralPattern, pattern2: Union[NeuralPattern, List[int]]):
-        value = pattern2
         if isinstance(pattern2, NeuralPattern):
-            value = pattern2.value
-        intersection = set(pattern1.value) & set(value)
-        return len(intersection) >= self.area.output_norm * HyperParameters.pattern_recognition_threshold
+            bits = pattern2.bits
+        else:
+            bits = pack_value(pattern2)
+        return overlap(pattern1.bits, bits) >= self.area.output_norm * HyperParameters.pattern_recognition_threshold
 
     def _get_raw_output(self, pattern: NeuralPattern) -> NeuralPattern:
-        connections = self.area.connections
-
-        if len(connections) == 0:
-            output_space_indexes = list(range(self.area.output_space_size))
+        if self.area.connections is None:
+            self.area.connections = self._generate_connections(pattern)
 
-            ratio = 0.12 * (self.area.output_space_size * self.area.output_norm) / pattern.value_size
-            connection_density = int(ratio)
-            for idx in range(pattern.space_size):
-                connections.append(random.sample(output_space_indexes, connection_density))
+        output, highway_connections = self._select_pattern(pattern, self.area.connections)
+        return self._trim_output(output), highway_connections
 
-        output, highway_connections = self._select_pattern(pattern, connections)
+    def _trim_output(self, output: List[int]) -> List[int]:
         if len(output) > self.area.output_norm:
-            output = random.sample(output, self.area.output_norm)
-
+            output = self.rng.choice(output, self.area.output_norm, replace=False).tolist()
         output.sort()
-        return output, highway_connections
+        return output
+
+    def _generate_connections(self, pattern: NeuralPattern) -> np.ndarray:
+        """
+        Random connections from every input cell to the output space,
+        row i holds the output cells the input cell i is connected to
+        """
+        ratio = 0.12 * (self.area.output_space_size * self.area.output_norm) / pattern.value_size
+        output_space_size = self.area.output_space_size
+        connection_density = min(int(ratio), output_space_size)
+        # draws density distinct cells per row, without a space_size x output_space_size intermediate
+        connections = np.empty((pattern.space_size, connection_density), dtype=np.int64)
+        for row in connections:
+            row[:] = self.rng.choice(output_space_size, connection_density, replace=False)
+        return connections
 
-    def _select_pattern(self, pattern: NeuralPattern, connections):
-        while True:
-            out_pattern, activated_connections = self._sample_activations(pattern, connections)
+    def _select_pattern(self, pattern: NeuralPattern, connections: np.ndarray):
+        """
+        Samples activations until enough output cells win. Activation probability grows after every failed attempt,
+        after HyperParameters.sdr_max_attempts attempts the top-k output cells are selected deterministically
+        """
+        probability = ACTIVATION_PROBABILITY
+        for attempt in range(1, HyperParameters.sdr_max_attempts + 1):
+            out_pattern, activated_connections = self._sample_activations(pattern, connections, probability)
             if out_pattern:
-                activated_connections = [c for c in activated_connections if c[1] in out_pattern]
-                return out_pattern, activated_connections
+                self.attempts_histogram[attempt] += 1
+                return out_pattern, self._filter_connections(activated_connections, out_pattern)
+            probability = min(1.0, probability * HyperParameters.sdr_activation_growth)
 
-    def _sample_activations(self, pattern: NeuralPattern, connections):
-        output_norm = self.area.output_norm
-        target_cells_activated = []
-        activated_connections = []
-        dropout = 0.0
+        self.attempts_histogram[HyperParameters.sdr_max_attempts + 1] += 1
+        self.num_fallbacks += 1
+        out_pattern, activated_connections = self._select_top_potentials(pattern, connections)
+        return out_pattern, self._filter_connections(activated_connections, out_pattern)
+
+    def _filter_connections(self, activated_connections, out_pattern):
+        sources, targets = activated_connections
+        in_output = np.zeros(self.area.output_space_size, dtype=bool)
+        in_output[out_pattern] = True
+        selected = in_output[targets]
+        return sources[selected], targets[selected]
+
+    def _gather_connections(self, pattern: NeuralPattern, outgoing_connections: np.ndarray, fired=None):
+        """
+        :return: (sources, targets) of the fired connections of the active cells, plus all their highway connections
+        """
+        value = np.asarray(pattern.value, dtype=np.int64)
+        if fired is None:
+            sources = [np.repeat(value, outgoing_connections.shape[1])]
+            targets = [outgoing_connections.ravel()]
+        else:
+            sources = [np.repeat(value, fired.sum(axis=1))]
+            targets = [outgoing_connections[fired]]
+        highway_connections = self.area.highway_connections
         for idx in pattern.value:
-            outgoing_connections = connections[idx]
-            outgoing_activations = [c for c in outgoing_connections if random.randint(0, 99) < 10]
-            highway_activations = [c[1] for c in self.area.highway_connections if c[0] == idx]
-            # outgoing_activations.extend(highway_activations * 2)
-            # highway_activations = random.sample(highway_activations, int(len(highway_activations) * (1 - dropout)))
-            outgoing_activations.extend(highway_activations)
-            activated_connections.extend([(idx, target) for target in outgoing_activations])
-            target_cells_activated.extend(outgoing_activations)
-
-        counters = list(collections.Counter(target_cells_activated).items())
-        counters.sort(key=lambda x: x[1], reverse=True)
-        highest_potential = counters[0][1]
+            highway_activations = highway_connections.targets_from(idx)
+            if len(highway_activations):
+                sources.append(np.full(len(highway_activations), idx, dtype=np.int64))
+                targets.append(highway_activations)
+        return np.concatenate(sources), np.concatenate(targets)
+
+    def _select_top_potentials(self, pattern: NeuralPattern, connections: np.ndarray):
+        """
+        Deterministic fallback: every connection fires, the output_norm cells with the highest potential win,
+        ties are resolved in favor of the lower index
+        """
+        sources, targets = self._gather_connections(pattern, connections[pattern.value])
+        potentials = np.bincount(targets, minlength=self.area.output_space_size)
+        winners = np.argsort(-potentials, kind='stable')[:self.area.output_norm]
+        return winners.tolist(), (sources, targets)
+
+    def _sample_activations(self, pattern: NeuralPattern, connections: np.ndarray, probability: float):
+        """
+        Each connection of an active input cell fires with :param probability:, highway connections always fire.
+        Output cells are ranked by the number of fired incoming connections, ties are broken randomly
+        :return: output cell indices and (sources, targets) of the fired connections, or (None, None)
+        """
+        outgoing_connections = connections[pattern.value]
+        fired = self.rng.random(outgoing_connections.shape) < probability
+        sources, targets = self._gather_connections(pattern, outgoing_connections, fired)
+        if len(targets) == 0:
+            return None, None
+
+        potentials = np.bincount(targets, minlength=self.area.output_space_size)
+        out_pattern = self._select_winners(potentials)
+        if out_pattern is None:
+            return None, None
+        return out_pattern, (sources, targets)
+
+    def _select_winners(self, potentials: np.ndarray):
+        """
+        Selects the output cells from their potentials, i.e. the numbers of fired incoming connections
+        :return: output cell indices or None if there are not enough strong cells
+        """
+        output_norm = self.area.output_norm
+        activated = np.flatnonzero(potentials)
+        if len(activated) == 0:
+            return None
+        ranked = activated[np.lexsort((self.rng.random(len(activated)), -potentials[activated]))]
+        ranked_potentials = potentials[ranked]
+        highest_potential = ranked_potentials[0]
         if highest_potential > 2:
-            result = [c[0] for c in counters if c[1] > 2]
+            result = ranked[ranked_potentials > 2]
             if len(result) >= output_norm:
-                return result[:output_norm], activated_connections
-            else:
-                with_high_potential = [c[0] for c in counters if c[1] == 2]
-                if len(result) + len(with_high_potential) >= output_norm:
-                    result = result + random.sample(with_high_potential, output_norm - len(result))
-                    return result, activated_connections
-                else:
-                    return None, None
+                return result[:output_norm].tolist()
+            with_high_potential = ranked[ranked_potentials == 2]
+            if len(result) + len(with_high_potential) >= output_norm:
+                chosen = self.rng.choice(with_high_potential, output_norm - len(result), replace=False)
+                return result.tolist() + chosen.tolist()
         else:
-            result = [c[0] for c in counters if c[1] > 1]
-            if len(result) >= self.area.output_norm:
-                return result, activated_connections
-        return None, None
+            result = ranked[ranked_potentials > 1]
+            if len(result) >= output_norm:
+                return result.tolist()
+        return None
 
     @staticmethod
-    def make_combined_pattern(inputs: List[NeuralPattern], input_sizes) -> NeuralPattern:
+    def make_combined_pattern(inputs: List[NeuralPattern], input_sizes, area: 'NeuralArea') -> NeuralPattern:
+        """
+        Shifts the input patterns into their slots and finds or creates the pattern made of them
+        in the pattern namespace of :param area:
+        Repeated combinations are served from the container's combined pattern cache, hit rates are counted per area
+        """
+        combined_pattern_cache = area.container.combined_pattern_cache
+        cache_key = combined_pattern_cache.make_key(inputs, input_sizes)
+        combined_pattern = combined_pattern_cache.get(cache_key, area.name)
+        if combined_pattern is not None:
+            combined_pattern.source_patterns = [pattern for pattern in inputs if pattern]
+            return combined_pattern
+
         combined_input_indices = []
         combined_input_data = {}
         combined_pattern = None
@@ -112,9 +297,11 @@ class SDRProcessor:
             combined_pattern = NeuralPattern.find_or_create(
                 space_size=sum(input_sizes),
                 value=combined_input_indices,
-                data=combined_input_data
+                data=combined_input_data,
+                registry=area.container.pattern_registry
             )
             # combined_pattern.merge_histories(histories)
             combined_pattern.source_patterns = alive_patterns
+            combined_pattern_cache.put(cache_key, combined_pattern)
         return combined_pattern
 
@@ -0,0 +1,122 @@
+import heapq
+
+from neuro.neural_area import NeuralArea
+
+
+def _noop():
+    pass
+
+
+NOOP_CODE = _noop.__code__.co_code
+
+
+def is_noop(method) -> bool:
+    """
+    True if the bound method's body does nothing, i.e. compiles to a bare `return None`
+    """
+    code = getattr(getattr(method, '__func__', method), '__code__', None)
+    return code is not None and code.co_code == NOOP_CODE and not code.co_names
+
+
+class StepSchedule:
+    """
+    Flat list of the bound methods a network step calls, compiled from the container
+    Hooks that do nothing and closed connections are dropped, areas are ordered topologically
+    along the inter-area connections (container order breaks ties and orders the cycles)
+    """
+    def __init__(self, container):
+        self.container = container
+        self.version = container.version
+        self.begin_hooks = [zone.on_step_begin for zone in container.zones if not is_noop(zone.on_step_begin)]
+        self.areas = [area for area in self._topological_areas() if not self._is_noop_update(area)]
+        self.area_updates = [area.update for area in self.areas]
+        self.levels = self._dependency_levels(self.areas)
+        self.batches = self._parallel_batches(self.areas, self.levels)
+        self.connection_updates = [c.update for c in container.connections if c.is_open]
+        self.end_hooks = [zone.on_step_end for zone in container.zones if not is_noop(zone.on_step_end)]
+        self.num_dropped = (2 * len(container.zones) + len(container.areas) + len(container.connections)
+                            - len(self.begin_hooks) - len(self.area_updates)
+                            - len(self.connection_updates) - len(self.end_hooks))
+
+    @staticmethod
+    def _is_noop_update(area) -> bool:
+        if type(area).update is NeuralArea.update:
+            # the base update only notifies the zone
+            return is_noop(area.zone.on_area_updated)
+        return is_noop(area.update)
+
+    def _area_edges(self, areas) -> list:
+        positions = {area: i for i, area in enumerate(areas)}
+        edges = []
+        for connection in self.container.connections:
+            source, target = positions.get(connection.source), positions.get(connection.target)
+            if source is not None and target is not None and source != target:
+                edges.append((source, target))
+        return edges
+
+    def _dependency_levels(self, areas) -> list:
+        """
+        Splits topologically ordered areas into levels, no area depends on another one of its level
+        Areas from the first one reached by a cycle on get a level of their own each
+        """
+        edges = sorted(self._area_edges(areas))
+        tail_start = min([target for source, target in edges if source >= target], default=len(areas))
+        levels_of = [0] * len(areas)
+        for source, target in edges:
+            if source < target:
+                levels_of[target] = max(levels_of[target], levels_of[source] + 1)
+        levels = {}
+        for i in range(tail_start):
+            levels.setdefault(levels_of[i], []).append(areas[i])
+        ordered = [levels[level] for level in sorted(levels)]
+        ordered.extend([area] for area in areas[tail_start:])
+        return ordered
+
+    @staticmethod
+    def _parallel_batches(areas, levels) -> list:
+        """
+        Splits the ordered areas into consecutive runs without changing their order. A run holds either
+        the areas with parallel_update of one dependency level that follow each other, or a single area
+        """
+        level_of = {area: i for i, level in enumerate(levels) for area in level}
+        batches = []
+        for area in areas:
+            last = batches[-1][0] if batches else None
+            if last is not None and area.parallel_update and last.parallel_update and level_of[area] == level_of[last]:
+                batches[-1].append(area)
+            else:
+                batches.append([area])
+        return batches
+
+    def _topological_areas(self) -> list:
+        areas = self.container.areas
+        positions = {area: i for i, area in enumerate(areas)}
+        successors = {i: [] for i in range(len(areas))}
+        in_degrees = [0] * len(areas)
+        for connection in self.container.connections:
+            source, target = positions.get(connection.source), positions.get(connection.target)
+            if source is None or target is None or source == target:
+                continue
+            successors[source].append(target)
+            in_degrees[target] += 1
+
+        ready = [i for i in range(len(areas)) if in_degrees[i] == 0]
+        heapq.heapify(ready)
+        ordered = []
+        while ready:
+            i = heapq.heappop(ready)
+            ordered.append(i)
+            for j in successors[i]:
+                in_degrees[j] -= 1
+                if in_degrees[j] == 0:
+                    heapq.heappush(ready, j)
+        # areas on cycles keep the container order
+        ordered_set = set(ordered)
+        ordered.extend(i for i in range(len(areas)) if i not in ordered_set)
+        return [areas[i] for i in ordered]
+
+    def is_stale(self) -> bool:
+        return self.version != self.container.version
+
+    def __len__(self):
+        return len(self.begin_hooks) + len(self.area_updates) + len(self.connection_updates) + len(self.end_hooks)
@@ -0,0 +1,78 @@
+from typing import Callable, Iterator, Tuple
+
+
+class TickRingBuffer:
+    """
+    Tick-keyed history that retains only the last :param capacity: ticks
+    Supports the dict operations the areas use (item access, `in`, get) with O(1) inserts,
+    plus range queries over a window of ticks. Slots are allocated on the first insert
+    """
+    def __init__(self, capacity: int, on_evict: Callable = None):
+        if capacity <= 0:
+            raise ValueError('capacity must be positive')
+        self.capacity = capacity
+        # called with the value that drops out of the window or gets overwritten
+        self.on_evict = on_evict
+        self._ticks = None
+        self._values = None
+        self.latest_tick = None
+
+    def __setitem__(self, tick: int, value):
+        self.put(tick, value)
+
+    def put(self, tick: int, value) -> bool:
+        """
+        Stores :param value: for :param tick: unless the tick is older than the retention window
+        :return: whether the value was stored, so callers pin what the buffer holds only on success
+        """
+        if self._ticks is None:
+            self._ticks = [None] * self.capacity
+            self._values = [None] * self.capacity
+        if self.latest_tick is not None and tick <= self.latest_tick - self.capacity:
+            # older than the retention window
+            return False
+        slot = tick % self.capacity
+        if self._ticks[slot] is not None and self.on_evict:
+            self.on_evict(self._values[slot])
+        self._ticks[slot] = tick
+        self._values[slot] = value
+        if self.latest_tick is None or tick > self.latest_tick:
+            self.latest_tick = tick
+        return True
+
+    def __getitem__(self, tick: int):
+        if tick not in self:
+            raise KeyError(tick)
+        return self._values[tick % self.capacity]
+
+    def __contains__(self, tick: int) -> bool:
+        return self._ticks is not None and self._ticks[tick % self.capacity] == tick and \
+            tick > self.latest_tick - self.capacity
+
+    def get(self, tick: int, default=None):
+        if tick in self:
+            return self._values[tick % self.capacity]
+        return default
+
+    def range(self, start_tick: int, end_tick: int) -> Iterator[Tuple[int, object]]:
+        """
+        (tick, value) pairs of the retained ticks in [start_tick, end_tick) in tick order
+        """
+        if self._ticks is None:
+            return
+        start_tick = max(start_tick, self.latest_tick - self.capacity + 1)
+        for tick in range(start_tick, end_tick):
+            slot = tick % self.capacity
+            if self._ticks[slot] == tick:
+                yield tick, self._values[slot]
+
+    def items(self) -> Iterator[Tuple[int, object]]:
+        if self._ticks is None:
+            return iter(())
+        return self.range(self.latest_tick - self.capacity + 1, self.latest_tick + 1)
+
+    def __iter__(self):
+        return (tick for tick, _ in self.items())
+
+    def __len__(self):
+        return sum(1 for _ in self.items())
@@ -90,6 +90,12 @@ class ReflexZone(NeuralZone):
 
         self.combiner.output_areas.append(dopamine_anticipator)
 
+    def num_reflexes(self) -> int:
+        """
+        Number of pattern-to-action connections learned by the reflex areas
+        """
+        return sum(len(area.connections) for area in self.areas if isinstance(area, ReflexArea))
+
     def receive_self_induced_dope(self, dope_value: int):
         self.accumulated_dope += dope_value
 
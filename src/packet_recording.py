@@ -0,0 +1,136 @@
+"""
+Records the environment packets an agent receives and replays them without the physics and vision stack
+A recording is a gzip stream of pickled records: a header with the agent seed and hyperparameters,
+then a (packet, output) pair per environment step. Values are stored as plain Python types,
+so replaying needs neither Box2D nor sympy, shapely or OpenCV
+Replay from the src directory: python -m packet_recording logs/run.rec
+"""
+import gzip
+import numbers
+import pickle
+import sys
+import time
+
+import numpy as np
+
+from agent import Agent
+from neuro.hyper_params import HyperParameters
+
+RECORDING_FORMAT = 1
+
+
+def to_plain(value):
+    """
+    Copy of :param value: made of Python containers and numbers, e.g. sympy and NumPy numbers become int or float
+    """
+    if value is None or isinstance(value, (bool, str)):
+        return value
+    if isinstance(value, dict):
+        return {to_plain(key): to_plain(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return tuple(to_plain(item) for item in value)
+    if isinstance(value, list):
+        return [to_plain(item) for item in value]
+    if isinstance(value, np.ndarray):
+        return to_plain(value.tolist())
+    if isinstance(value, numbers.Integral):
+        return int(value)
+    if isinstance(value, numbers.Real):
+        return float(value)
+    raise TypeError(f'Cannot record a value of type {type(value).__name__}')
+
+
+def hyperparameters() -> dict:
+    return {name: value for name, value in vars(HyperParameters).items()
+            if not name.startswith('_') and not callable(value) and not isinstance(value, classmethod)}
+
+
+class PacketRecorder:
+    """
+    Stands in for the agent's env_step and writes every packet with the agent output to a recording
+    """
+    def __init__(self, agent: Agent, filename: str):
+        self.agent = agent
+        self.filename = filename
+        self.num_records = 0
+        self._file = gzip.open(filename, 'wb', compresslevel=6)
+        header = {'format': RECORDING_FORMAT, 'seed': agent.seed, 'hyperparameters': hyperparameters()}
+        pickle.dump(header, self._file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def env_step(self, packet: dict) -> dict:
+        # the agent changes packet bodies in place, so the packet is copied before the step
+        plain_packet = to_plain(packet)
+        output = self.agent.env_step(packet)
+        pickle.dump((plain_packet, to_plain(output)), self._file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.num_records += 1
+        return output
+
+    def close(self):
+        self._file.close()
+
+
+class PacketReplayer:
+    """
+    Feeds a recording to a fresh agent built with the recorded seed and hyperparameters
+    and compares the agent outputs with the recorded ones
+    """
+    def __init__(self, filename: str):
+        self.filename = filename
+        with gzip.open(filename, 'rb') as file:
+            self.header = pickle.load(file)
+        if self.header.get('format') != RECORDING_FORMAT:
+            raise ValueError(f'Unsupported recording format: {self.header.get("format")}')
+
+    def records(self):
+        """
+        (packet, output) pairs of the recording in step order
+        """
+        with gzip.open(self.filename, 'rb') as file:
+            pickle.load(file)
+            while True:
+                try:
+                    yield pickle.load(file)
+                except EOFError:
+                    return
+
+    def replay(self, max_ticks: int = None) -> dict:
+        """
+        :return: the number of replayed ticks, the time spent in env_step and the ticks whose outputs differ
+        """
+        mismatches = []
+        seconds = 0.0
+        num_ticks = 0
+        with HyperParameters.override(**self.header['hyperparameters']):
+            agent = Agent(seed=self.header['seed'])
+            for packet, recorded_output in self.records():
+                if max_ticks is not None and num_ticks >= max_ticks:
+                    break
+                start = time.perf_counter()
+                output = agent.env_step(packet)
+                seconds += time.perf_counter() - start
+                if to_plain(output) != recorded_output:
+                    mismatches.append(num_ticks)
+                num_ticks += 1
+            agent.network.close()
+        return {
+            'ticks': num_ticks,
+            'seconds': seconds,
+            'ticks_per_second': num_ticks / seconds if seconds else 0.0,
+            'mismatches': mismatches,
+        }
+
+
+def main():
+    filename = sys.argv[1]
+    max_ticks = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    result = PacketReplayer(filename).replay(max_ticks)
+    print(f'\n{result["ticks"]} ticks replayed, {result["ticks_per_second"]:.1f} ticks/s')
+    if result['mismatches']:
+        print(f'{len(result["mismatches"])} outputs differ from the recording, the first one at step '
+              f'{result["mismatches"][0]}')
+        sys.exit(1)
+    print('outputs match the recording')
+
+
+if __name__ == '__main__':
+    main()
@@ -26,7 +26,7 @@ def change_pattern(pattern, coefficient):
         if val not in new_value:
             new_value.append(val)
     new_value.sort()
-    return NeuralPattern(space_size=pattern.space_size, value=new_value)
+    return NeuralPattern(space_size=pattern.space_size, value=new_value, registry=pattern.registry)
 
 
 def main():
@@ -45,7 +45,8 @@ def main():
     )
 
     sdr = SDRProcessor(area)
-    common_pattern = NeuralPattern(space_size=space_size, value_size=value_size)
+    registry = agent.container.pattern_registry
+    common_pattern = NeuralPattern(space_size=space_size, value_size=value_size, registry=registry)
     common_pattern.generate_random()
 
     patterns = []
@@ -53,12 +54,13 @@ def main():
     false_positives = 0
     false_negatives = 0
     for i in range(num_trials):
-        random_pattern = NeuralPattern(space_size=space_size, value_size=value_size)
+        random_pattern = NeuralPattern(space_size=space_size, value_size=value_size, registry=registry)
         random_pattern.generate_random()
 
         combined_pattern = SDRProcessor.make_combined_pattern(
             [random_pattern, common_pattern],
-            [space_size, space_size]
+            [space_size, space_size],
+            area
         )
 
         out_pattern1, new = area.recognize_process_input(combined_pattern)
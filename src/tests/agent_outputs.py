@@ -0,0 +1,23 @@
+from agent import Agent
+from neuro.hyper_params import HyperParameters
+
+from packets import make_packets
+
+
+def run_agent(log_filename: str, num_ticks: int, on_agent=None, **overrides) -> tuple:
+    """
+    Steps a seeded agent through synthetic packets
+    :param on_agent: called with the agent before the first step
+    :return: the agent outputs and the network
+    """
+    with HyperParameters.override(**overrides):
+        agent = Agent(log_filename=log_filename)
+        if on_agent:
+            on_agent(agent)
+        outputs = []
+        for packet in make_packets(num_ticks):
+            output = agent.env_step(packet)
+            outputs.append((output['current_tick'], output['surprise'], dict(output['actions']),
+                            dict(output['attention-spot']), agent.reflex.num_reflexes()))
+        agent.network.close()
+    return outputs, agent.network
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the sources are imported as top-level modules, as when running from the src directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
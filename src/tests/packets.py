@@ -0,0 +1,29 @@
+import random
+
+
+def quadrants(rng: random.Random) -> dict:
+    return {'quadrants': [[{'angle': rng.choice([20, 45, 60, 90, 120, 170]), 'mass': rng.choice([0, 1, 2])}
+                           for _ in range(rng.randint(1, 3))] for _ in range(4)]}
+
+
+def make_packets(num_ticks: int, seed: int = 5) -> list:
+    """
+    Synthetic environment packets with a circle, a triangle and the hand moving at random
+    """
+    rng = random.Random(seed)
+    shapes = {name: quadrants(rng) for name in ['circle', 'triangle', 'hand']}
+    positions = {'circle': [400, 400], 'triangle': [200, 420], 'hand': [320, 300]}
+    packets = []
+    for _ in range(num_ticks):
+        data = []
+        for name in ['circle', 'triangle', 'hand']:
+            dx, dy = 0, 0
+            if rng.random() < 0.3:
+                dx, dy = rng.randint(-5, 5), rng.randint(-5, 5)
+            position = positions[name]
+            position[0] = min(639, max(0, position[0] + dx))
+            position[1] = min(479, max(0, position[1] + dy))
+            data.append({'name': name, 'center': tuple(position), 'offset': (dx, dy),
+                         'general_presentation': shapes[name], 'overlay': name == 'hand'})
+        packets.append({'data': data, 'mode': {'is_clenched': rng.random() < 0.2, 'is_holding': rng.random() < 0.1}})
+    return packets
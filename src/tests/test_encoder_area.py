@@ -0,0 +1,34 @@
+from agent import Agent
+from neuro.areas.encoder_area import EncoderArea
+from neuro.neural_pattern import NeuralPattern
+
+from agent_outputs import run_agent
+
+
+def test_docstring_comes_first():
+    assert EncoderArea.__doc__.strip() == 'Converts a low level perceptive pattern to a sparse pattern'
+    assert EncoderArea.parallel_update
+
+
+def test_event_driven_updates_keep_the_outputs(tmp_path):
+    log_filename = str(tmp_path / 'log.txt')
+    every_area, _ = run_agent(log_filename, 300)
+    event_driven, network = run_agent(log_filename, 300, event_driven_updates=True)
+    assert event_driven == every_area
+    assert network.total_skipped > 0
+
+
+def test_clean_encoder_is_skipped(tmp_path):
+    agent = Agent(log_filename=str(tmp_path / 'log.txt'))
+    area = next(area for area in agent.container.areas if area.name == 'shape')
+    assert isinstance(area, EncoderArea) and area.min_inputs > 0
+    area.dirty = False
+    area._cached_output = None
+    assert not area.needs_update()
+
+    area.mark_dirty()
+    assert area.needs_update()
+
+    area.output = NeuralPattern(area.output_space_size, value=[1, 2, 3], registry=agent.container.pattern_registry)
+    area.skip_update()
+    assert area.output is None
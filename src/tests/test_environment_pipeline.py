@@ -0,0 +1,104 @@
+import importlib
+import sys
+import threading
+import types
+
+import numpy as np
+import pytest
+
+from agent import ACTIONS
+
+from packets import make_packets
+
+
+class FakeImageProcessor:
+    def __init__(self, world, server=False, arm_size=None, arm=None):
+        self.packets = make_packets(100)
+        self.num_runs = 0
+
+    def set_arm(self, arm_size, arm):
+        pass
+
+    def run(self, last_step, last_data):
+        data = self.packets[self.num_runs % len(self.packets)]['data']
+        self.num_runs += 1
+        return data
+
+
+class FakeWorld:
+    def __init__(self):
+        self.bodies = []
+        self.num_steps = 0
+
+    def Step(self, *args):
+        self.num_steps += 1
+
+    def ClearForces(self):
+        pass
+
+
+class FakeAgent:
+    def __init__(self, fail_at: int = None):
+        self.fail_at = fail_at
+        self.num_steps = 0
+
+    def env_step(self, packet: dict) -> dict:
+        if self.num_steps == self.fail_at:
+            raise RuntimeError('agent failure')
+        self.num_steps += 1
+        return {'actions': {action: self.num_steps % 2 for action in ACTIONS}}
+
+
+class FakeEnvironment:
+    hz = 60.0
+    velocity_iterations = 8
+    position_iterations = 3
+
+    def __init__(self, agent: FakeAgent):
+        self.agent = agent
+        self.recorder = None
+        self.world = FakeWorld()
+        self.agent_hand = types.SimpleNamespace(hand_contour=np.zeros((4, 2)))
+        self.grab = False
+        self.min_ind = False
+        self.num_step = 0
+        self.applied_actions = []
+        self.cur_step = None
+        self.agent_message = None
+
+    def arm_size(self) -> tuple:
+        return 0, 0, 1, 1
+
+    def Keyboard(self, actions=None):
+        self.applied_actions.append(actions)
+
+
+@pytest.fixture
+def environment_pipeline(monkeypatch):
+    monkeypatch.setitem(sys.modules, 'cv.image_processor', types.SimpleNamespace(ImageProcessor=FakeImageProcessor))
+    monkeypatch.delitem(sys.modules, 'environment_pipeline', raising=False)
+    return importlib.import_module('environment_pipeline')
+
+
+@pytest.mark.parametrize('lag_tolerance', [0, 1, 3])
+def test_actions_fit_the_bounded_queue(environment_pipeline, lag_tolerance):
+    environment = FakeEnvironment(FakeAgent())
+    report = environment_pipeline.EnvironmentPipeline(environment, lag_tolerance).run(30)
+    assert report['ticks'] == 30
+    assert environment.agent.num_steps == 30
+    assert environment.world.num_steps == 29
+    assert environment.applied_actions[lag_tolerance] == {action: 1 for action in ACTIONS}
+
+
+def test_physics_stops_when_the_agent_fails(environment_pipeline):
+    class RecordingPipeline(environment_pipeline.EnvironmentPipeline):
+        def _run_physics(self, *args):
+            self.physics_thread = threading.current_thread()
+            super()._run_physics(*args)
+
+    environment = FakeEnvironment(FakeAgent(fail_at=5))
+    pipeline = RecordingPipeline(environment, lag_tolerance=2)
+    with pytest.raises(RuntimeError, match='agent failure'):
+        pipeline.run(30)
+    assert not pipeline.physics_thread.is_alive()
+    assert environment.world.num_steps < 29
@@ -0,0 +1,45 @@
+import pytest
+
+from neuro.inverted_pattern_index import InvertedPatternIndex
+from neuro.neural_pattern import NeuralPattern
+from neuro.pattern_registry import PatternRegistry
+
+
+@pytest.fixture
+def registry():
+    return PatternRegistry()
+
+
+def make_index(registry, *patterns) -> InvertedPatternIndex:
+    index = InvertedPatternIndex()
+    for i, (space_size, value) in enumerate(patterns):
+        index.add(NeuralPattern(space_size, value=value, registry=registry), i)
+    return index
+
+
+@pytest.mark.parametrize('best_match', [False, True])
+def test_zero_threshold_skips_incomparable_patterns(registry, best_match):
+    index = make_index(registry, (200, [1, 2, 3]), (100, [1, 2]), (100, [5, 6, 7]))
+    pattern = NeuralPattern(100, value=[1, 2, 9], registry=registry)
+    assert index.find(pattern, 0.0, best_match) == 2
+
+
+@pytest.mark.parametrize('best_match', [False, True])
+def test_zero_threshold_without_comparable_patterns(registry, best_match):
+    index = make_index(registry, (200, [1, 2, 3]), (100, [1, 2]))
+    pattern = NeuralPattern(100, value=[1, 2, 9], registry=registry)
+    assert index.find(pattern, 0.0, best_match) is None
+
+
+def test_zero_threshold_best_match_prefers_the_largest_overlap(registry):
+    index = make_index(registry, (100, [5, 6, 7]), (100, [1, 6, 8]), (100, [1, 2, 8]))
+    pattern = NeuralPattern(100, value=[1, 2, 9], registry=registry)
+    assert index.find(pattern, 0.0) == 0
+    assert index.find(pattern, 0.0, best_match=True) == 2
+
+
+def test_threshold_requires_the_overlap(registry):
+    index = make_index(registry, (100, [1, 6, 8]), (100, [1, 2, 8]))
+    pattern = NeuralPattern(100, value=[1, 2, 9], registry=registry)
+    assert index.find(pattern, 0.6) == 1
+    assert index.find(pattern, 0.9) is None
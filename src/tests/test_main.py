@@ -0,0 +1,57 @@
+import sys
+import types
+
+import pytest
+
+import main
+
+
+class FakeEnvironment:
+    def __init__(self, recording_filename=None):
+        self.num_step = 0
+        self.serial_ticks = 0
+        self.closed = False
+        environments.append(self)
+
+    def run(self, num_ticks: int) -> float:
+        self.serial_ticks += num_ticks
+        self.num_step += num_ticks
+        return 1.0
+
+    def close(self):
+        self.closed = True
+
+
+class FakePipeline:
+    def __init__(self, environment, lag_tolerance: int = 2):
+        self.environment = environment
+
+    def run(self, num_ticks: int) -> dict:
+        self.environment.num_step += num_ticks
+        return {'ticks_per_second': 1.0, 'stages': {}}
+
+
+environments = []
+
+
+@pytest.fixture
+def fake_modules(monkeypatch):
+    environments.clear()
+    monkeypatch.setitem(sys.modules, 'headless_environment',
+                        types.SimpleNamespace(HeadlessEnvironment=FakeEnvironment))
+    monkeypatch.setitem(sys.modules, 'environment_pipeline', types.SimpleNamespace(EnvironmentPipeline=FakePipeline))
+
+
+def test_pipelined_run_makes_exactly_the_requested_ticks(fake_modules):
+    main.run_headless(num_ticks=50, pipeline_lag=2)
+    environment, = environments
+    assert environment.num_step == 50
+    assert environment.serial_ticks == 0
+    assert environment.closed
+
+
+def test_serial_run(fake_modules):
+    main.run_headless(num_ticks=50)
+    environment, = environments
+    assert environment.serial_ticks == 50
+    assert environment.closed
@@ -0,0 +1,69 @@
+import pytest
+
+from agent import Agent
+from neuro.hyper_params import HyperParameters
+
+from agent_outputs import run_agent
+
+NUM_TICKS = 300
+
+
+def test_parallel_step_matches_serial(tmp_path):
+    log_filename = str(tmp_path / 'log.txt')
+    serial, _ = run_agent(log_filename, NUM_TICKS)
+    parallel, _ = run_agent(log_filename, NUM_TICKS, parallel_area_updates=True)
+    assert parallel == serial
+
+
+def test_parallel_runs_are_deterministic(tmp_path):
+    log_filename = str(tmp_path / 'log.txt')
+    first, _ = run_agent(log_filename, NUM_TICKS, parallel_area_updates=True, parallel_workers=4)
+    second, _ = run_agent(log_filename, NUM_TICKS, parallel_area_updates=True, parallel_workers=4)
+    assert first == second
+
+
+def test_batches_keep_the_schedule_order(tmp_path):
+    agent = Agent(log_filename=str(tmp_path / 'log.txt'))
+    schedule = agent.network.schedule
+    assert [area for batch in schedule.batches for area in batch] == schedule.areas
+    parallel_batches = [batch for batch in schedule.batches if len(batch) > 1]
+    assert parallel_batches
+    for batch in parallel_batches:
+        assert all(area.parallel_update for area in batch)
+        assert any(batch[0] in level and all(area in level for area in batch) for level in schedule.levels)
+
+
+def test_generic_loop_rejects_parallel_updates(tmp_path):
+    with HyperParameters.override(parallel_area_updates=True):
+        agent = Agent(log_filename=str(tmp_path / 'log.txt'))
+    agent.network.use_compiled_schedule = False
+    with pytest.raises(ValueError):
+        agent.network.step()
+
+
+def test_update_equals_its_split_parts(tmp_path):
+    log_filename = str(tmp_path / 'log.txt')
+
+    def record_outputs(outputs, split):
+        def on_agent(agent):
+            area = next(area for area in agent.container.areas if area.name == 'shape')
+
+            def update():
+                if split:
+                    pattern = area.begin_update()
+                    if pattern is not None:
+                        area.finish_update(pattern, area.encode(pattern))
+                else:
+                    type(area).update(area)
+                outputs.append(list(area.output.value) if area.output else None)
+            area.update = update
+            # the schedule holds the bound update methods
+            agent.network.compile_schedule()
+        return on_agent
+
+    whole_outputs, split_outputs = [], []
+    whole, _ = run_agent(log_filename, NUM_TICKS, on_agent=record_outputs(whole_outputs, split=False))
+    split, _ = run_agent(log_filename, NUM_TICKS, on_agent=record_outputs(split_outputs, split=True))
+    assert any(whole_outputs)
+    assert split_outputs == whole_outputs
+    assert split == whole
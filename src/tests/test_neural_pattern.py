@@ -0,0 +1,33 @@
+from types import SimpleNamespace
+
+import pytest
+
+from neuro.neural_pattern import NeuralPattern
+from neuro.pattern_registry import PatternRegistry
+
+
+def test_value_is_read_only():
+    registry = PatternRegistry()
+    pattern = NeuralPattern(100, value=[3, 7, 42], registry=registry)
+    with pytest.raises(AttributeError):
+        pattern.value = [1, 2, 3]
+    assert list(pattern.value) == [3, 7, 42]
+    assert registry.find(100, [3, 7, 42]) is pattern
+
+
+def test_patterns_keep_no_dict():
+    pattern = NeuralPattern(100, value=[1, 2], registry=PatternRegistry())
+    with pytest.raises(AttributeError):
+        pattern.extra = 1
+
+
+def test_log_keeps_history_only_once_it_is_read():
+    area = SimpleNamespace(container=SimpleNamespace(network=SimpleNamespace(current_tick=3)))
+    pattern = NeuralPattern(100, value=[1, 2], registry=PatternRegistry())
+    pattern.log(area)
+    assert pattern._history is None
+
+    assert 3 not in pattern.history
+    area.container.network.current_tick = 4
+    pattern.log(area)
+    assert pattern.history[4] == [area]
@@ -0,0 +1,63 @@
+import gc
+import weakref
+
+from neuro.combined_pattern_cache import CombinedPatternCache
+from neuro.hyper_params import HyperParameters
+from neuro.neural_pattern import NeuralPattern
+from neuro.pattern_registry import PatternRegistry
+
+from packets import make_packets
+
+
+def test_cache_does_not_keep_patterns_alive():
+    registry = PatternRegistry(capacity=4)
+    cache = CombinedPatternCache()
+    pattern = NeuralPattern(100, value=[1, 2, 3], registry=registry)
+    cache.put(('key',), pattern)
+    assert cache.get(('key',)) is pattern
+
+    reference = weakref.ref(pattern)
+    del pattern
+    for i in range(10):
+        NeuralPattern(100, value=[i + 10], registry=registry)
+    gc.collect()
+    assert reference() is None
+    assert cache.get(('key',)) is None
+    assert cache.num_reclaimed == 1
+    assert len(cache) == 0
+
+
+def test_over_capacity_is_reported():
+    registry = PatternRegistry(capacity=10)
+    patterns = [NeuralPattern(100, value=[i], registry=registry) for i in range(10)]
+    registry.acquire(*patterns)
+    registry.capacity = 4
+    assert registry.compact() == 0
+    metrics = registry.metrics()
+    assert metrics['live'] == 10
+    assert metrics['over_capacity'] == 6
+
+
+def test_unpinned_combined_patterns_are_freed_by_network_steps(tmp_path):
+    from agent import Agent
+
+    with HyperParameters.override(pattern_store_capacity=200):
+        agent = Agent(log_filename=str(tmp_path / 'log.txt'))
+        cache = agent.container.combined_pattern_cache
+        registry = agent.container.pattern_registry
+        combined_patterns = []
+        put = cache.put
+
+        def recording_put(key, pattern):
+            combined_patterns.append(weakref.ref(pattern))
+            put(key, pattern)
+
+        cache.put = recording_put
+        for packet in make_packets(1000):
+            agent.env_step(packet)
+        gc.collect()
+
+        freed = [reference for reference in combined_patterns if reference() is None]
+        assert freed
+        assert registry.metrics()['reclaimed'] > 0
+        agent.network.close()
@@ -0,0 +1,105 @@
+import random
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from neuro.highway_connections import HighwayConnections
+from neuro.hyper_params import HyperParameters
+from neuro.neural_pattern import NeuralPattern
+from neuro.pattern_registry import PatternRegistry
+from neuro.sdr_processor import SDRProcessor
+
+
+def make_area(output_space_size=None, output_norm=None):
+    return SimpleNamespace(
+        output_space_size=output_space_size or HyperParameters.encoder_space_size,
+        output_norm=output_norm or HyperParameters.encoder_norm,
+        connections=None,
+        highway_connections=HighwayConnections(),
+        container=SimpleNamespace(pattern_registry=PatternRegistry()),
+    )
+
+
+def make_pattern(area, space_size=2000, value_size=40):
+    return NeuralPattern(space_size, value_size, generate_inplace=True, registry=area.container.pattern_registry)
+
+
+def test_generated_connections_are_distinct_per_row():
+    random.seed(0)
+    area = make_area()
+    pattern = make_pattern(area)
+    connections = SDRProcessor(area)._generate_connections(pattern)
+    density = int(0.12 * area.output_space_size * area.output_norm / pattern.value_size)
+    assert connections.shape == (pattern.space_size, density)
+    assert connections.min() >= 0 and connections.max() < area.output_space_size
+    assert all(len(np.unique(row)) == density for row in connections)
+
+
+def test_connection_density_is_capped_by_the_output_space():
+    random.seed(0)
+    area = make_area(output_space_size=50, output_norm=20)
+    pattern = make_pattern(area, space_size=100, value_size=2)
+    connections = SDRProcessor(area)._generate_connections(pattern)
+    assert connections.shape == (100, 50)
+    assert all(sorted(row) == list(range(50)) for row in connections)
+
+
+def failing_sampler(processor, probabilities):
+    def sample_activations(pattern, connections, probability):
+        probabilities.append(probability)
+        return None, None
+    processor._sample_activations = sample_activations
+
+
+def test_activation_probability_grows_until_the_fallback():
+    random.seed(0)
+    area = make_area()
+    processor = SDRProcessor(area)
+    probabilities = []
+    failing_sampler(processor, probabilities)
+    with HyperParameters.override(sdr_max_attempts=8, sdr_activation_growth=1.5):
+        output, (sources, targets) = processor.sample(make_pattern(area))
+
+    assert probabilities == pytest.approx([min(1.0, 0.1 * 1.5 ** i) for i in range(8)])
+    assert processor.num_fallbacks == 1
+    assert processor.attempts_histogram == {9: 1}
+    assert len(output) == area.output_norm
+    assert set(targets.tolist()) <= set(output)
+
+
+def test_fixed_probability_without_growth():
+    random.seed(0)
+    area = make_area()
+    processor = SDRProcessor(area)
+    probabilities = []
+    failing_sampler(processor, probabilities)
+    with HyperParameters.override(sdr_max_attempts=20, sdr_activation_growth=1.0):
+        processor.sample(make_pattern(area))
+    assert probabilities == [0.1] * 20
+
+
+def test_fallback_selects_the_top_potentials():
+    random.seed(0)
+    area = make_area()
+    processor = SDRProcessor(area)
+    pattern = make_pattern(area)
+    failing_sampler(processor, [])
+    output, _ = processor.sample(pattern)
+
+    potentials = np.bincount(area.connections[pattern.value].ravel(), minlength=area.output_space_size)
+    assert sorted(output) == sorted(np.argsort(-potentials, kind='stable')[:area.output_norm].tolist())
+
+
+def test_attempts_histogram_accounts_for_every_encode():
+    random.seed(1)
+    area = make_area()
+    processor = SDRProcessor(area)
+    for _ in range(200):
+        output, _ = processor.sample(make_pattern(area))
+        assert len(output) == area.output_norm
+    histogram = processor.attempts_histogram
+    fallback = HyperParameters.sdr_max_attempts + 1
+    assert sum(histogram.values()) == 200
+    assert all(1 <= attempts <= fallback for attempts in histogram)
+    assert processor.num_fallbacks == histogram[fallback]
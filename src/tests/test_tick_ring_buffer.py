@@ -0,0 +1,26 @@
+import pytest
+
+from neuro.hyper_params import HyperParameters
+from neuro.neural_area import DOPAMINE_LOOKBACK
+from neuro.tick_ring_buffer import TickRingBuffer
+
+
+def test_stale_writes_are_not_stored():
+    evicted = []
+    history = TickRingBuffer(4, on_evict=evicted.append)
+    assert all(history.put(tick, tick) for tick in range(6))
+    assert evicted == [0, 1]
+    assert not history.put(1, 'stale')
+    assert 1 not in history
+    assert evicted == [0, 1]
+    assert list(history.items()) == [(2, 2), (3, 3), (4, 4), (5, 5)]
+
+
+def test_history_retention_must_cover_the_dopamine_lookback(tmp_path):
+    from agent import Agent
+
+    with HyperParameters.override(history_retention=DOPAMINE_LOOKBACK):
+        with pytest.raises(ValueError):
+            Agent(log_filename=str(tmp_path / 'log.txt'))
+    with HyperParameters.override(history_retention=DOPAMINE_LOOKBACK + 1):
+        Agent(log_filename=str(tmp_path / 'log.txt')).network.close()